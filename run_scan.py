@@ -5,44 +5,154 @@ Works both standalone and as a GitHub Action.
 
 import sys
 import os
+import base64
+import hashlib
+import http.client
+import ssl
+import time
+import urllib.parse
 import urllib.request
 import json
-from src.scanner import CodeShieldScanner
+import shutil
+from collections import Counter
+from pathlib import Path
+from src.scanner import MAX_LINE_LENGTH, CodeShieldScanner
 
 
-def validate_license_lemonsqueezy(license_key):
-    """Validate license key with LemonSqueezy API."""
+LICENSE_CACHE_PATH = Path.home() / '.codeshield' / 'license.json'
+LICENSE_CACHE_TTL = 60 * 60
+
+_CRITICAL_SEVS = frozenset(('HIGH', 'CRITICAL'))
+
+LICENSE_API_HOST = 'api.lemonsqueezy.com'
+LICENSE_API_PATH = '/v1/licenses/validate'
+
+# Built once at import; every HTTPS request reuses its loaded CA bundle
+_SSL_CONTEXT = ssl.create_default_context()
+_license_conn = None
+
+REPORT_PATH = 'codeshield-report.txt'
+
+
+def _load_license_cache():
+    """Load cached license validations, keyed by SHA-256 of the license key."""
+    try:
+        with open(LICENSE_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_license_cache(cache):
+    """Write the license cache atomically so parallel jobs never read half a file."""
+    try:
+        LICENSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = LICENSE_CACHE_PATH.with_name(f"{LICENSE_CACHE_PATH.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, LICENSE_CACHE_PATH)
+    except OSError as e:
+        print(f"License cache warning: {e}")
+
+
+def _open_license_conn():
+    """Open an HTTPS connection to the license API, via the HTTPS proxy if one is set.
+
+    http.client does not read HTTPS_PROXY / NO_PROXY the way urlopen does,
+    so urllib's own lookup picks the proxy and the request is tunnelled
+    through it with CONNECT.
+    """
+    proxy = urllib.request.getproxies().get('https')
+    if not proxy or urllib.request.proxy_bypass(LICENSE_API_HOST):
+        return http.client.HTTPSConnection(LICENSE_API_HOST, timeout=10, context=_SSL_CONTEXT)
+
+    parsed = urllib.parse.urlsplit(proxy if '://' in proxy else f'http://{proxy}')
+    headers = {}
+    if parsed.username:
+        credentials = f"{urllib.parse.unquote(parsed.username)}:{urllib.parse.unquote(parsed.password or '')}"
+        headers['Proxy-Authorization'] = 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+    conn = http.client.HTTPSConnection(
+        parsed.hostname, parsed.port or 80, timeout=10, context=_SSL_CONTEXT
+    )
+    conn.set_tunnel(LICENSE_API_HOST, 443, headers=headers)
+    return conn
+
+
+def _post_license_api(body):
+    """POST ``body`` to the license API over a kept-alive HTTPS connection.
+
+    The connection is opened on first use and reused afterwards, so only the
+    first validation in a process pays for the TLS handshake. If the server
+    closed the idle connection, the request is retried once on a fresh one.
+    """
+    global _license_conn
+    headers = {'Content-Type': 'application/json'}
+    for attempt in range(2):
+        if _license_conn is None:
+            _license_conn = _open_license_conn()
+        try:
+            _license_conn.request('POST', LICENSE_API_PATH, body=body, headers=headers)
+            response = _license_conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError) as e:
+            _license_conn.close()
+            _license_conn = None
+            if attempt or not isinstance(e, ConnectionError):
+                raise
+
+
+def validate_license_lemonsqueezy(license_key, offline=False):
+    """Validate license key with LemonSqueezy API, reusing a recent result if cached.
+
+    Only successful validations are cached, so a newly purchased key is never
+    held back by a stale negative answer. With ``offline`` a cached entry is
+    trusted regardless of its age.
+    """
     if not license_key:
         return False, None
 
+    key_hash = hashlib.sha256(license_key.encode('utf-8')).hexdigest()
+    cache = _load_license_cache()
+    entry = cache.get(key_hash)
+    if isinstance(entry, dict) and (offline or time.time() < entry.get('exp', 0)):
+        return True, entry.get('plan')
+
     try:
-        url = "https://api.lemonsqueezy.com/v1/licenses/validate"
         data = json.dumps({"license_key": license_key}).encode('utf-8')
+        status, payload = _post_license_api(data)
+        if status >= 400:
+            print(f"License validation warning: HTTP Error {status}")
+            return False, None
 
-        req = urllib.request.Request(
-            url,
-            data=data,
-            headers={'Content-Type': 'application/json'},
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = json.loads(response.read().decode('utf-8'))
+        result = json.loads(payload.decode('utf-8'))
 
-            if result.get('valid'):
-                product_name = result.get('meta', {}).get('product_name', '').lower()
-                if 'team' in product_name:
-                    return True, 'team'
-                else:
-                    return True, 'pro'
+        if result.get('valid'):
+            product_name = result.get('meta', {}).get('product_name', '').lower()
+            plan_type = 'team' if 'team' in product_name else 'pro'
+            cache[key_hash] = {'plan': plan_type, 'exp': time.time() + LICENSE_CACHE_TTL}
+            _save_license_cache(cache)
+            return True, plan_type
 
-            return False, None
+        return False, None
 
     except Exception as e:
         print(f"License validation warning: {e}")
         return False, None
 
 
+def _count_critical(findings):
+    """Count HIGH and CRITICAL findings from a single tally of every severity."""
+    severity_counts = Counter(f.severity for f in findings)
+    return sum(severity_counts[severity] for severity in _CRITICAL_SEVS)
+
+
+def _save_report(scanner):
+    """Stream the report straight into REPORT_PATH."""
+    with open(REPORT_PATH, 'w') as f:
+        scanner.generate_report(f)
+
+
 def create_github_pr(findings, repo, token):
     """Create a GitHub Pull Request with AutoFix AI suggestions."""
     if not findings or not token:
@@ -81,13 +191,13 @@ def create_github_pr(findings, repo, token):
         pr_body += "CodeShield AI has detected the following security issues and generated fix suggestions:\n\n"
 
         for i, finding in enumerate(findings[:5], 1):
-            pr_body += f"### Issue #{i}: {finding.get('vulnerability', 'Security Issue')}\n"
-            pr_body += f"- **File:** `{finding.get('file', 'Unknown')}`\n"
-            pr_body += f"- **Line:** {finding.get('line', 0)}\n"
-            pr_body += f"- **Severity:** {finding.get('severity', 'HIGH')}\n\n"
+            pr_body += f"### Issue #{i}: {finding.vulnerability}\n"
+            pr_body += f"- **File:** `{finding.file}`\n"
+            pr_body += f"- **Line:** {finding.line}\n"
+            pr_body += f"- **Severity:** {finding.severity}\n\n"
 
-            autofix = finding.get('autofix')
-            if autofix:
+            autofix = finding.autofix
+            if autofix is not None:
                 pr_body += "**AutoFix AI Suggestion:**\n"
                 pr_body += f"```\n{autofix.get('fix_code', '')}\n```\n\n"
                 pr_body += "**Steps to fix:**\n"
@@ -115,6 +225,30 @@ def create_github_pr(findings, repo, token):
         return None
 
 
+def _option_value(name):
+    """Return the value of a ``--name=value`` command-line option, or None."""
+    prefix = name + '='
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return None
+
+
+def _whole_number_option(flag, env_name):
+    """Read a ``--flag=N`` option or its action input as an int; None if unset."""
+    value = _option_value(flag) or os.environ.get(env_name, '')
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        print(f"❌ Error: {flag[2:]} must be a whole number, got {value!r}")
+        sys.exit(1)
+    return number
+
+
 def main():
     print("=" * 60)
     print("  CODESHIELD AI - SECURITY SCANNER WITH AUTOFIX AI")
@@ -122,7 +256,8 @@ def main():
     print()
 
     license_key = os.environ.get('INPUT_LICENSE-KEY', '')
-    is_licensed, plan_type = validate_license_lemonsqueezy(license_key)
+    offline = '--offline' in sys.argv[1:] or os.environ.get('INPUT_LICENSE-OFFLINE', 'false').lower() == 'true'
+    is_licensed, plan_type = validate_license_lemonsqueezy(license_key, offline=offline)
 
     if is_licensed:
         print(f"✅ License validated: {plan_type.upper()} plan")
@@ -133,9 +268,24 @@ def main():
 
     print()
 
-    scanner = CodeShieldScanner()
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    # The scan cache is opt-in and kept outside the checkout (see src/scan_cache.py)
+    use_cache = '--cache' in sys.argv[1:] or os.environ.get('INPUT_CACHE', 'false').lower() == 'true'
 
-    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('INPUT_TARGET', 'examples/vulnerable_code.py')
+    # --jobs=N / the jobs input sets the worker processes; unset means one per CPU
+    jobs = _whole_number_option('--jobs', 'INPUT_JOBS')
+
+    # --max-line-length=N / the max-line-length input; files with a longer
+    # line get only the secrets scan. 0 turns the check off.
+    max_line_length = _whole_number_option('--max-line-length', 'INPUT_MAX-LINE-LENGTH')
+    if max_line_length is None:
+        max_line_length = MAX_LINE_LENGTH
+    elif max_line_length == 0:
+        max_line_length = None
+
+    scanner = CodeShieldScanner(use_cache=use_cache, jobs=jobs, max_line_length=max_line_length)
+
+    target = args[0] if args else os.environ.get('INPUT_TARGET', 'examples/vulnerable_code.py')
 
     fail_on_issues = os.environ.get('INPUT_FAIL-ON-ISSUES', 'true').lower() == 'true'
     is_private_repo = os.environ.get('GITHUB_REPOSITORY_PRIVATE', 'false').lower() == 'true'
@@ -165,12 +315,14 @@ def main():
         print(f"❌ Error: {target} is not a valid file or directory")
         sys.exit(1)
 
-    report = scanner.generate_report()
-    print(report)
+    if scanner.cache is not None:
+        scanner.cache.save()
 
-    with open('codeshield-report.txt', 'w') as f:
-        f.write(report)
-    print("📄 Report saved to: codeshield-report.txt")
+    _save_report(scanner)
+    with open(REPORT_PATH, 'r') as f:
+        shutil.copyfileobj(f, sys.stdout)
+    print()
+    print(f"📄 Report saved to: {REPORT_PATH}")
 
     if findings and create_pr and github_token and github_repo and is_licensed:
         print()
@@ -181,22 +333,21 @@ def main():
         else:
             print("⚠️  AutoFix PR creation failed - check token permissions")
 
+    critical_count = _count_critical(findings)
+
     if os.environ.get('GITHUB_ACTIONS'):
         github_output = os.environ.get('GITHUB_OUTPUT')
         if github_output:
             with open(github_output, 'a') as f:
                 f.write(f"issues-found={len(findings)}\n")
-                critical = len([i for i in findings if i.get('severity') in ['HIGH', 'CRITICAL']])
-                f.write(f"critical-issues={critical}\n")
-                f.write(f"report-path=codeshield-report.txt\n")
-
-    if fail_on_issues and findings:
-        critical_count = len([i for i in findings if i.get('severity') in ['HIGH', 'CRITICAL']])
-        if critical_count > 0:
-            print()
-            print(f"❌ Build failed: Found {critical_count} critical security issues")
-            print("   Fix the issues above and push again")
-            sys.exit(1)
+                f.write(f"critical-issues={critical_count}\n")
+                f.write(f"report-path={REPORT_PATH}\n")
+
+    if fail_on_issues and critical_count > 0:
+        print()
+        print(f"❌ Build failed: Found {critical_count} critical security issues")
+        print("   Fix the issues above and push again")
+        sys.exit(1)
 
     print()
     print("✅ CodeShield scan complete!")
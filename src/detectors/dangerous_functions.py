@@ -3,63 +3,151 @@ Detector for dangerous function usage in Python code.
 Catches eval(), exec(), __import__(), compile(), and other risky functions.
 """
 
+import ast
 import re
 from typing import List, Dict
 
+from src.finding import Finding
+from src.source_file import SourceFile
+
+_DANGEROUS_FUNCTION_RECS: Dict[str, str] = {
+    'eval': "Avoid eval(). Use ast.literal_eval() for safe evaluation of literals, or json.loads() for JSON data.",
+    'exec': "Avoid exec(). Consider using specific functions or safer alternatives for your use case.",
+    'compile': "Avoid compile() with untrusted input. Validate and sanitize all inputs first.",
+    '__import__': "Use importlib.import_module() instead of __import__() for safer dynamic imports.",
+    'execfile': "execfile() is removed in Python 3. Use exec(open(file).read()) only with trusted files.",
+}
+
+# compile() only builds a code object; it is a risk when the result is run,
+# which exec/eval already report, so it alone does not fail a build
+_SEVERITIES: Dict[str, str] = {'compile': 'MEDIUM'}
+
+_DEFAULT_REC = "Review this function usage carefully and ensure input is validated."
+
+
+class DangerousCallFinding(Finding):
+    """A dangerous call site; message and recommendation are formatted only when read.
+
+    Both follow from ``function``, so the values Finding's __init__ (or
+    unpickling) assigns to them are dropped rather than stored.
+    """
+    __slots__ = ()
+    
+    @property
+    def message(self) -> str:
+        return f"Dangerous function '{self.function}()' detected. This can lead to code injection vulnerabilities."
+    
+    @message.setter
+    def message(self, value) -> None:
+        pass
+    
+    @property
+    def recommendation(self) -> str:
+        return _DANGEROUS_FUNCTION_RECS.get(self.function, _DEFAULT_REC)
+    
+    @recommendation.setter
+    def recommendation(self, value) -> None:
+        pass
+
+
 class DangerousFunctionsDetector:
     """Detects usage of dangerous Python functions that can lead to code injection."""
     
+    # These are Python builtins; the scanner runs this detector on Python files only
+    EXTENSIONS = frozenset({'.py'})
+    
+    # input() is not listed: only Python 2's evaluated what it read, and
+    # this detector parses Python 3 source
     DANGEROUS_FUNCTIONS = [
         'eval',
         'exec',
         'compile',
         '__import__',
         'execfile',
-        'input',
     ]
     
-    def __init__(self):
-        self.findings = []
+    _DANGEROUS_SET = frozenset(DANGEROUS_FUNCTIONS)
+    
+    # One alternation over every dangerous name, compiled once at class load
+    _CALL_PATTERN = re.compile(r'\b(' + '|'.join(map(re.escape, DANGEROUS_FUNCTIONS)) + r')\s*\(')
     
-    def scan(self, code: str, filename: str = "unknown") -> List[Dict]:
-        self.findings = []
-        lines = code.split('\n')
+    def scan(self, source: SourceFile) -> List[Finding]:
+        # Findings are kept local: one instance is shared by every scan
+        findings: List[Finding] = []
+        
+        # ast.parse is the expensive step; skip it when the file does not even
+        # name a dangerous function as a whole word (``input_file`` or
+        # ``compiled`` do not count). str.find keeps the search in C, which a
+        # regex alternation of the names loses.
+        if not any(self._names(source.code, name) for name in self.DANGEROUS_FUNCTIONS):
+            return findings
+        
+        try:
+            tree = ast.parse(source.code)
+        except (SyntaxError, ValueError, RecursionError, MemoryError):
+            # Not valid Python (or not Python at all), or nested too deeply
+            # for the parser: fall back to the line scan
+            return self._scan_lines(source)
         
-        for line_num, line in enumerate(lines, start=1):
-            if line.strip().startswith('#'):
+        # Only real calls to the bare names count, so matches inside strings,
+        # docstrings and trailing comments are never reported.
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Call)
+                    and isinstance(node.func, ast.Name)
+                    and node.func.id in self._DANGEROUS_SET):
+                findings.append(self._make_finding(
+                    source, node.lineno, self._column(source, node), node.func.id
+                ))
+        
+        findings.sort(key=lambda f: (f.line, f.column))
+        return findings
+    
+    @staticmethod
+    def _names(code: str, name: str) -> bool:
+        start = code.find(name)
+        while start != -1:
+            end = start + len(name)
+            before = code[start - 1] if start else ' '
+            after = code[end] if end < len(code) else ' '
+            if not (before.isalnum() or before == '_' or after.isalnum() or after == '_'):
+                return True
+            start = code.find(name, end)
+        return False
+    
+    def _column(self, source: SourceFile, node: ast.AST) -> int:
+        # col_offset counts UTF-8 bytes; convert it to a 1-based character column
+        line = source.lines[node.lineno - 1]
+        if line.isascii():
+            return node.col_offset + 1
+        return len(line.encode('utf-8')[:node.col_offset].decode('utf-8', 'ignore')) + 1
+    
+    def _scan_lines(self, source: SourceFile) -> List[Finding]:
+        findings = []
+        for line_num in range(1, len(source.lines) + 1):
+            if source.comment_mask[line_num - 1]:
                 continue
+            line = source.lines[line_num - 1]
             
-            for func in self.DANGEROUS_FUNCTIONS:
-                pattern = rf'\b{func}\s*\('
-                
-                if re.search(pattern, line):
-                    self.findings.append({
-                        'file': filename,
-                        'line': line_num,
-                        'column': line.index(func) + 1,
-                        'function': func,
-                        'severity': 'HIGH',
-                        'message': f"Dangerous function '{func}()' detected. This can lead to code injection vulnerabilities.",
-                        'code_snippet': line.strip(),
-                        'recommendation': self._get_recommendation(func)
-                    })
-        
-        return self.findings
+            for match in self._CALL_PATTERN.finditer(line):
+                findings.append(self._make_finding(
+                    source, line_num, match.start() + 1, match.group(1)
+                ))
+        return findings
     
-    def _get_recommendation(self, function: str) -> str:
-        recommendations = {
-            'eval': "Avoid eval(). Use ast.literal_eval() for safe evaluation of literals, or json.loads() for JSON data.",
-            'exec': "Avoid exec(). Consider using specific functions or safer alternatives for your use case.",
-            'compile': "Avoid compile() with untrusted input. Validate and sanitize all inputs first.",
-            '__import__': "Use importlib.import_module() instead of __import__() for safer dynamic imports.",
-            'execfile': "execfile() is removed in Python 3. Use exec(open(file).read()) only with trusted files.",
-            'input': "In Python 2, input() uses eval(). Use raw_input() instead, or upgrade to Python 3."
-        }
-        return recommendations.get(function, "Review this function usage carefully and ensure input is validated.")
+    def _make_finding(self, source: SourceFile, line_num: int, column: int, func: str) -> Finding:
+        return DangerousCallFinding(
+            file=source.path,
+            line=line_num,
+            column=column,
+            severity=_SEVERITIES.get(func, 'HIGH'),
+            vulnerability='Dangerous Function',
+            code_snippet=source.lines[line_num - 1].strip(),
+            function=func,
+        )
     
-    def get_summary(self) -> Dict:
+    def get_summary(self, findings: List[Finding]) -> Dict:
         return {
-            'total_issues': len(self.findings),
-            'high_severity': len([f for f in self.findings if f['severity'] == 'HIGH']),
-            'files_scanned': len(set(f['file'] for f in self.findings))
+            'total_issues': len(findings),
+            'high_severity': len([f for f in findings if f.severity == 'HIGH']),
+            'files_scanned': len(set(f.file for f in findings))
         }
\ No newline at end of file
@@ -3,155 +3,330 @@ Secrets detector for CodeShield AI.
 Detects hardcoded secrets and provides AutoFix AI suggestions.
 """
 
+import os
 import re
 
+try:
+    # Optional: pyahocorasick finds any of many literals in one pass over a
+    # line. A single regex alternation is used when it is absent.
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # Optional: Hyperscan looks for every pattern's literals in one SIMD
+    # pass over the file, which tells which patterns can occur at all.
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+from src.finding import Finding
+from src.source_file import SourceFile
+
+
+_PATTERNS = [
+    {
+        'name': 'AWS Access Key',
+        'pattern': r'AKIA[0-9A-Z]{16}',
+        'literals': ('AKIA',),
+        'severity': 'CRITICAL',
+        'description': 'Hardcoded AWS Access Key detected',
+        'env_var': 'AWS_ACCESS_KEY_ID',
+    },
+    {
+        'name': 'AWS Secret Key',
+        'pattern': r'(?i)aws.{0,20}secret.{0,20}["\']([A-Za-z0-9/+=]{40})["\']',
+        'literals': ('aws',),
+        'severity': 'CRITICAL',
+        'description': 'Hardcoded AWS Secret Key detected',
+        'env_var': 'AWS_SECRET_ACCESS_KEY',
+    },
+    {
+        'name': 'GitHub Token',
+        'pattern': r'ghp_[A-Za-z0-9]{36}',
+        'literals': ('ghp_',),
+        'severity': 'CRITICAL',
+        'description': 'Hardcoded GitHub Personal Access Token detected',
+        'env_var': 'GITHUB_TOKEN',
+    },
+    {
+        'name': 'Stripe Live Secret Key',
+        'pattern': r'sk_live_[A-Za-z0-9]{24,}',
+        'literals': ('sk_live_',),
+        'severity': 'CRITICAL',
+        'description': 'Hardcoded Stripe Live Secret Key detected',
+        'env_var': 'STRIPE_SECRET_KEY',
+    },
+    {
+        'name': 'Stripe Live Public Key',
+        'pattern': r'pk_live_[A-Za-z0-9]{24,}',
+        'literals': ('pk_live_',),
+        'severity': 'HIGH',
+        'description': 'Hardcoded Stripe Live Public Key detected',
+        'env_var': 'STRIPE_PUBLIC_KEY',
+    },
+    {
+        'name': 'OpenAI API Key',
+        'pattern': r'sk-[A-Za-z0-9]{48}',
+        'literals': ('sk-',),
+        'severity': 'CRITICAL',
+        'description': 'Hardcoded OpenAI API Key detected',
+        'env_var': 'OPENAI_API_KEY',
+    },
+    {
+        'name': 'Google API Key',
+        'pattern': r'AIza[0-9A-Za-z\-_]{35}',
+        'literals': ('AIza',),
+        'severity': 'HIGH',
+        'description': 'Hardcoded Google API Key detected',
+        'env_var': 'GOOGLE_API_KEY',
+    },
+    {
+        'name': 'Slack Token',
+        'pattern': r'xox[baprs]-[A-Za-z0-9\-]{10,}',
+        'literals': ('xox',),
+        'severity': 'HIGH',
+        'description': 'Hardcoded Slack Token detected',
+        'env_var': 'SLACK_TOKEN',
+    },
+    {
+        'name': 'Private Key',
+        'pattern': r'-----BEGIN (RSA |EC |PGP )?PRIVATE KEY-----',
+        'literals': ('-----BEGIN ',),
+        'severity': 'CRITICAL',
+        'description': 'Private key found in source code',
+        'env_var': 'PRIVATE_KEY',
+    },
+    {
+        'name': 'Database URL',
+        'pattern': r'(postgres|mysql|mongodb)://[A-Za-z0-9]+:[A-Za-z0-9@#$%^&+=]{8,}@',
+        'literals': ('postgres://', 'mysql://', 'mongodb://'),
+        'severity': 'CRITICAL',
+        'description': 'Hardcoded database connection string with credentials detected',
+        'env_var': 'DATABASE_URL',
+    },
+    {
+        'name': 'Generic Password',
+        # Whitespace and the value stop at a newline (as in Generic API Key),
+        # so a whole-file search never carries a match into later lines.
+        'pattern': r'(?i)(password|passwd|pwd)[^\S\n]*=[^\S\n]*["\'][^"\'\n]{6,}["\']',
+        'literals': ('pass', 'pwd'),
+        'severity': 'HIGH',
+        'description': 'Hardcoded password detected',
+        'env_var': 'APP_PASSWORD',
+        'generic': True,
+    },
+    {
+        'name': 'Generic API Key',
+        'pattern': r'(?i)(api_key|apikey|api-key)[^\S\n]*=[^\S\n]*["\'][^"\'\n]{10,}["\']',
+        'literals': ('api',),
+        'severity': 'HIGH',
+        'description': 'Hardcoded API key detected',
+        'env_var': 'API_KEY',
+        'generic': True,
+    },
+    {
+        'name': 'JWT Token',
+        # The header segment is bounded: unbounded, every 'eyJ' inside a long
+        # run of token characters restarts a scan to the end of the run.
+        'pattern': r'eyJ[A-Za-z0-9\-_=]{1,1024}\.[A-Za-z0-9\-_=]+\.?[A-Za-z0-9\-_.+/=]*',
+        'literals': ('eyJ',),
+        'severity': 'HIGH',
+        'description': 'Hardcoded JWT token detected',
+        'env_var': 'JWT_TOKEN',
+    },
+]
+
+
+for pattern_info in _PATTERNS:
+    # The advice depends only on the pattern, so format it once here
+    pattern_info['recommendation'] = (
+        f"Replace hardcoded {pattern_info['name']} with environment variable {pattern_info['env_var']}"
+    )
+    pattern_info.setdefault('generic', False)
+    # Case-insensitive patterns list their literals lower-case
+    pattern_info['ignore_case'] = pattern_info['pattern'].startswith('(?i)')
+    # Compiled once at import; a pattern that fails to compile is skipped
+    try:
+        pattern_info['regex'] = re.compile(pattern_info['pattern'])
+    except re.error:
+        pattern_info['regex'] = None
+
+
+def _build_hyperscan(patterns, ignore_case):
+    """Compile the literals of the patterns into a Hyperscan database, or None.
+
+    Only the literals go in, as escaped byte strings, so a hit is a plain
+    substring match and the answer is the same as the ``in`` test it
+    replaces; the patterns themselves are left to ``re``, whose syntax and
+    Unicode classes Hyperscan does not share. Pattern ids are indices into
+    ``patterns`` and each reports at most one match.
+    """
+    if hyperscan is None:
+        return None
+    expressions, ids = [], []
+    for index, pattern_info in enumerate(patterns):
+        if pattern_info['regex'] is None or pattern_info['ignore_case'] != ignore_case:
+            continue
+        for literal in pattern_info['literals']:
+            expressions.append(re.escape(literal).encode('utf-8'))
+            ids.append(index)
+    if not expressions:
+        return None
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    try:
+        database.compile(
+            expressions=expressions, ids=ids,
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+        )
+    except hyperscan.error:
+        return None
+    return database
+
+
+# (case-sensitive literals, lower-cased literals); both None without Hyperscan
+_HYPERSCAN = (_build_hyperscan(_PATTERNS, False), _build_hyperscan(_PATTERNS, True))
+if None in _HYPERSCAN:
+    _HYPERSCAN = None
+
+
+def _build_indicator_search(indicators):
+    """Return a function telling whether a lower-cased line holds any indicator.
+
+    Indicators are matched as written, so only lower-case ones can ever hit.
+    """
+    words = set(indicators)
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for word in words:
+            automaton.add_word(word, word)
+        automaton.make_automaton()
+        return lambda line_lower: next(automaton.iter(line_lower), None) is not None
+    pattern = re.compile('|'.join(map(re.escape, sorted(words))))
+    return lambda line_lower: pattern.search(line_lower) is not None
+
+
+def _python_fix(env_var):
+    return {
+        'import': 'import os',
+        'fix': f"os.environ.get('{env_var}')",
+        'env_example': f"{env_var}=your_{env_var.lower()}_here",
+        'full_example': f"import os\n\n# Load from environment variable\n{env_var.lower()} = os.environ.get('{env_var}')\nif not {env_var.lower()}:\n    raise ValueError('{env_var} environment variable not set')",
+    }
+
+
+def _javascript_fix(env_var):
+    return {
+        'import': '',
+        'fix': f"process.env.{env_var}",
+        'env_example': f"{env_var}=your_{env_var.lower()}_here",
+        'full_example': f"// Load from environment variable\nconst {env_var.lower()} = process.env.{env_var};\nif (!{env_var.lower()}) {{\n  throw new Error('{env_var} environment variable not set');\n}}",
+    }
+
+
+def _typescript_fix(env_var):
+    return {
+        'import': '',
+        'fix': f"process.env.{env_var}",
+        'env_example': f"{env_var}=your_{env_var.lower()}_here",
+        'full_example': f"// Load from environment variable\nconst {env_var.lower()}: string = process.env.{env_var} ?? '';\nif (!{env_var.lower()}) {{\n  throw new Error('{env_var} environment variable not set');\n}}",
+    }
+
+
+def _ruby_fix(env_var):
+    return {
+        'import': '',
+        'fix': f"ENV['{env_var}']",
+        'env_example': f"{env_var}=your_{env_var.lower()}_here",
+        'full_example': f"# Load from environment variable\n{env_var.lower()} = ENV['{env_var}']\nraise '{env_var} environment variable not set' if {env_var.lower()}.nil?",
+    }
+
+
+def _go_fix(env_var):
+    return {
+        'import': 'import "os"',
+        'fix': f'os.Getenv("{env_var}")',
+        'env_example': f"{env_var}=your_{env_var.lower()}_here",
+        'full_example': f'import "os"\n\n// Load from environment variable\n{env_var.lower()} := os.Getenv("{env_var}")\nif {env_var.lower()} == "" {{\n    panic("{env_var} environment variable not set")\n}}',
+    }
+
+
+def _php_fix(env_var):
+    return {
+        'import': '',
+        'fix': f"$_ENV['{env_var}']",
+        'env_example': f"{env_var}=your_{env_var.lower()}_here",
+        'full_example': f"// Load from environment variable\n${env_var.lower()} = $_ENV['{env_var}'] ?? getenv('{env_var}');\nif (!${env_var.lower()}) {{\n    throw new RuntimeException('{env_var} environment variable not set');\n}}",
+    }
+
+
+# Only the requested language's snippets are formatted; others fall back to Python
+_FIX_BUILDERS = {
+    'python': _python_fix,
+    'javascript': _javascript_fix,
+    'typescript': _typescript_fix,
+    'ruby': _ruby_fix,
+    'go': _go_fix,
+    'php': _php_fix,
+}
+
 
 class SecretsDetector:
+    # Minified bundles and generated files still ship real keys, so the
+    # scanner keeps running this detector on files with over-long lines
+    SCANS_MINIFIED = True
+
+    EXTENSION_LANGUAGES = {
+        '.py': 'python',
+        '.js': 'javascript',
+        '.ts': 'typescript',
+        '.rb': 'ruby',
+        '.go': 'go',
+        '.php': 'php',
+        '.java': 'java',
+        '.cs': 'csharp',
+        '.cpp': 'cpp',
+        '.yml': 'yaml',
+        '.yaml': 'yaml',
+        '.env': 'env',
+    }
+
+    # Matched against the lower-cased line. A "# TODO" note next to a key
+    # does not make it fake, so TODO and FIXME are deliberately not listed.
+    FALSE_POSITIVE_INDICATORS = (
+        'example', 'sample', 'test', 'dummy', 'fake',
+        'placeholder', 'your_', 'xxx', '123456', 'changeme',
+        'replace_me'
+    )
+
+    # Indicators are matched against the lower-cased line in a single pass
+    _has_false_positive_indicator = staticmethod(_build_indicator_search(FALSE_POSITIVE_INDICATORS))
+
     def __init__(self):
-        self.patterns = [
-            {
-                'name': 'AWS Access Key',
-                'pattern': r'AKIA[0-9A-Z]{16}',
-                'severity': 'CRITICAL',
-                'description': 'Hardcoded AWS Access Key detected',
-                'env_var': 'AWS_ACCESS_KEY_ID',
-            },
-            {
-                'name': 'AWS Secret Key',
-                'pattern': r'(?i)aws.{0,20}secret.{0,20}["\']([A-Za-z0-9/+=]{40})["\']',
-                'severity': 'CRITICAL',
-                'description': 'Hardcoded AWS Secret Key detected',
-                'env_var': 'AWS_SECRET_ACCESS_KEY',
-            },
-            {
-                'name': 'GitHub Token',
-                'pattern': r'ghp_[A-Za-z0-9]{36}',
-                'severity': 'CRITICAL',
-                'description': 'Hardcoded GitHub Personal Access Token detected',
-                'env_var': 'GITHUB_TOKEN',
-            },
-            {
-                'name': 'Stripe Live Secret Key',
-                'pattern': r'sk_live_[A-Za-z0-9]{24,}',
-                'severity': 'CRITICAL',
-                'description': 'Hardcoded Stripe Live Secret Key detected',
-                'env_var': 'STRIPE_SECRET_KEY',
-            },
-            {
-                'name': 'Stripe Live Public Key',
-                'pattern': r'pk_live_[A-Za-z0-9]{24,}',
-                'severity': 'HIGH',
-                'description': 'Hardcoded Stripe Live Public Key detected',
-                'env_var': 'STRIPE_PUBLIC_KEY',
-            },
-            {
-                'name': 'OpenAI API Key',
-                'pattern': r'sk-[A-Za-z0-9]{48}',
-                'severity': 'CRITICAL',
-                'description': 'Hardcoded OpenAI API Key detected',
-                'env_var': 'OPENAI_API_KEY',
-            },
-            {
-                'name': 'Google API Key',
-                'pattern': r'AIza[0-9A-Za-z\-_]{35}',
-                'severity': 'HIGH',
-                'description': 'Hardcoded Google API Key detected',
-                'env_var': 'GOOGLE_API_KEY',
-            },
-            {
-                'name': 'Slack Token',
-                'pattern': r'xox[baprs]-[A-Za-z0-9\-]{10,}',
-                'severity': 'HIGH',
-                'description': 'Hardcoded Slack Token detected',
-                'env_var': 'SLACK_TOKEN',
-            },
-            {
-                'name': 'Private Key',
-                'pattern': r'-----BEGIN (RSA |EC |PGP )?PRIVATE KEY-----',
-                'severity': 'CRITICAL',
-                'description': 'Private key found in source code',
-                'env_var': 'PRIVATE_KEY',
-            },
-            {
-                'name': 'Database URL',
-                'pattern': r'(postgres|mysql|mongodb)://[A-Za-z0-9]+:[A-Za-z0-9@#$%^&+=]{8,}@',
-                'severity': 'CRITICAL',
-                'description': 'Hardcoded database connection string with credentials detected',
-                'env_var': 'DATABASE_URL',
-            },
-            {
-                'name': 'Generic Password',
-                'pattern': r'(?i)(password|passwd|pwd)\s*=\s*["\'][^"\']{6,}["\']',
-                'severity': 'HIGH',
-                'description': 'Hardcoded password detected',
-                'env_var': 'APP_PASSWORD',
-            },
-            {
-                'name': 'Generic API Key',
-                'pattern': r'(?i)(api_key|apikey|api-key)\s*=\s*["\'][^"\']{10,}["\']',
-                'severity': 'HIGH',
-                'description': 'Hardcoded API key detected',
-                'env_var': 'API_KEY',
-            },
-            {
-                'name': 'JWT Token',
-                'pattern': r'eyJ[A-Za-z0-9\-_=]+\.[A-Za-z0-9\-_=]+\.?[A-Za-z0-9\-_.+/=]*',
-                'severity': 'HIGH',
-                'description': 'Hardcoded JWT token detected',
-                'env_var': 'JWT_TOKEN',
-            },
-        ]
+        self.patterns = _PATTERNS
+        self.hyperscan = _HYPERSCAN
+        self._autofix_cache = {}
 
     def _mask_secret(self, secret):
         if len(secret) <= 8:
             return '*' * len(secret)
         return secret[:4] + '*' * (len(secret) - 8) + secret[-4:]
 
-    def _generate_autofix(self, pattern_info, code_snippet, language):
-        """Generate AutoFix AI suggestion based on language and issue type."""
-        env_var = pattern_info['env_var']
-        name = pattern_info['name']
-
-        fixes = {
-            'python': {
-                'import': 'import os',
-                'fix': f"os.environ.get('{env_var}')",
-                'env_example': f"{env_var}=your_{env_var.lower()}_here",
-                'full_example': f"import os\n\n# Load from environment variable\n{env_var.lower()} = os.environ.get('{env_var}')\nif not {env_var.lower()}:\n    raise ValueError('{env_var} environment variable not set')",
-            },
-            'javascript': {
-                'import': '',
-                'fix': f"process.env.{env_var}",
-                'env_example': f"{env_var}=your_{env_var.lower()}_here",
-                'full_example': f"// Load from environment variable\nconst {env_var.lower()} = process.env.{env_var};\nif (!{env_var.lower()}) {{\n  throw new Error('{env_var} environment variable not set');\n}}",
-            },
-            'typescript': {
-                'import': '',
-                'fix': f"process.env.{env_var}",
-                'env_example': f"{env_var}=your_{env_var.lower()}_here",
-                'full_example': f"// Load from environment variable\nconst {env_var.lower()}: string = process.env.{env_var} ?? '';\nif (!{env_var.lower()}) {{\n  throw new Error('{env_var} environment variable not set');\n}}",
-            },
-            'ruby': {
-                'import': '',
-                'fix': f"ENV['{env_var}']",
-                'env_example': f"{env_var}=your_{env_var.lower()}_here",
-                'full_example': f"# Load from environment variable\n{env_var.downcase} = ENV['{env_var}']\nraise '{env_var} environment variable not set' if {env_var.downcase}.nil?",
-            },
-            'go': {
-                'import': 'import "os"',
-                'fix': f'os.Getenv("{env_var}")',
-                'env_example': f"{env_var}=your_{env_var.lower()}_here",
-                'full_example': f'import "os"\n\n// Load from environment variable\n{env_var.lower()} := os.Getenv("{env_var}")\nif {env_var.lower()} == "" {{\n    panic("{env_var} environment variable not set")\n}}',
-            },
-            'php': {
-                'import': '',
-                'fix': f"$_ENV['{env_var}']",
-                'env_example': f"{env_var}=your_{env_var.lower()}_here",
-                'full_example': f"// Load from environment variable\n${env_var.lower()} = $_ENV['{env_var}'] ?? getenv('{env_var}');\nif (!${env_var.lower()}) {{\n    throw new RuntimeException('{env_var} environment variable not set');\n}}",
-            },
-        }
+    def _generate_autofix(self, pattern_info, language):
+        """Return the AutoFix AI suggestion for a pattern and language.
 
-        lang_fix = fixes.get(language, fixes['python'])
+        The suggestion depends only on those two, so each one is built once
+        and shared by every finding it applies to.
+        """
+        key = (pattern_info['name'], pattern_info['env_var'], language)
+        autofix = self._autofix_cache.get(key)
+        if autofix is None:
+            autofix = self._autofix_cache[key] = self._build_autofix(*key)
+        return autofix
+
+    def _build_autofix(self, name, env_var, language):
+        """Generate AutoFix AI suggestion based on language and issue type."""
+        lang_fix = _FIX_BUILDERS.get(language, _python_fix)(env_var)
 
         return {
             'issue': f'Hardcoded {name} found in source code',
@@ -169,70 +344,112 @@ class SecretsDetector:
 
     def _detect_language(self, file_path):
         """Detect programming language from file extension."""
-        ext_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.rb': 'ruby',
-            '.go': 'go',
-            '.php': 'php',
-            '.java': 'java',
-            '.cs': 'csharp',
-            '.cpp': 'cpp',
-            '.yml': 'yaml',
-            '.yaml': 'yaml',
-            '.env': 'env',
-        }
-        for ext, lang in ext_map.items():
-            if file_path.endswith(ext):
-                return lang
-        return 'python'
+        root, ext = os.path.splitext(file_path)
+        if not ext and os.path.basename(root) == '.env':
+            # splitext treats a leading dot as part of the name, not a suffix
+            ext = '.env'
+        return self.EXTENSION_LANGUAGES.get(ext.lower(), 'python')
 
-    def _is_false_positive(self, match, line):
+    def _is_false_positive(self, match, line_lower):
         """Filter out common false positives."""
-        false_positive_indicators = [
-            'example', 'sample', 'test', 'dummy', 'fake',
-            'placeholder', 'your_', 'xxx', '123456', 'changeme',
-            'TODO', 'FIXME', 'replace_me'
-        ]
-        line_lower = line.lower()
-        for indicator in false_positive_indicators:
-            if indicator in line_lower:
-                return True
-        return False
-
-    def scan(self, file_path, content):
+        return self._has_false_positive_indicator(line_lower)
+
+    def _present_patterns(self, source):
+        """Return the patterns that can match somewhere in the file.
+
+        A pattern is kept if one of its literals is present, as a substring
+        test over the whole file is far cheaper than any regex. Hyperscan,
+        when installed, makes the same tests for every literal in one pass
+        per text. Either way, patterns that cannot match anywhere are
+        dropped before the line loop.
+        """
+        if self.hyperscan is not None:
+            hits = set()
+            on_match = lambda pattern_id, start, end, flags, context: hits.add(pattern_id)
+            case_db, lower_db = self.hyperscan
+            case_db.scan(source.code.encode('utf-8', 'replace'), match_event_handler=on_match)
+            lower_db.scan(source.code_lower.encode('utf-8', 'replace'), match_event_handler=on_match)
+            return [self.patterns[index] for index in sorted(hits)]
+
+        present = []
+        for pattern_info in self.patterns:
+            if pattern_info['regex'] is None:
+                continue
+            haystack = source.code_lower if pattern_info['ignore_case'] else source.code
+            if any(literal in haystack for literal in pattern_info['literals']):
+                present.append(pattern_info)
+        return present
+
+    def _candidate_lines(self, source, patterns):
+        """Return, in order, the lines holding a literal of any of ``patterns``."""
+        literals = set()
+        lower_literals = set()
+        for pattern_info in patterns:
+            (lower_literals if pattern_info['ignore_case'] else literals).update(pattern_info['literals'])
+        line_nums = source.literal_lines(literals)
+        if lower_literals:
+            line_nums = sorted(set(line_nums).union(source.literal_lines(lower_literals, source.code_lower)))
+        return line_nums
+
+    def scan(self, source: SourceFile):
         """Scan file content for secrets and generate AutoFix suggestions."""
         findings = []
+        patterns = self._present_patterns(source)
+        if not patterns:
+            return findings
+
+        file_path = source.path
         language = self._detect_language(file_path)
-        lines = content.split('\n')
 
-        for pattern_info in self.patterns:
-            try:
-                regex = re.compile(pattern_info['pattern'])
-                for line_num, line in enumerate(lines, 1):
-                    matches = regex.findall(line)
-                    if matches:
-                        match_str = matches[0] if isinstance(matches[0], str) else matches[0][0]
-                        if self._is_false_positive(match_str, line):
-                            continue
-
-                        masked = self._mask_secret(match_str)
-                        autofix = self._generate_autofix(pattern_info, line.strip(), language)
-
-                        findings.append({
-                            'file': file_path,
-                            'line': line_num,
-                            'column': line.find(match_str) + 1,
-                            'severity': pattern_info['severity'],
-                            'vulnerability': pattern_info['description'],
-                            'code_snippet': line.strip()[:100],
-                            'masked_secret': masked,
-                            'recommendation': f"Replace hardcoded {pattern_info['name']} with environment variable {pattern_info['env_var']}",
-                            'autofix': autofix,
-                            'language': language,
-                        })
-            except re.error:
-                continue
+        # Most lines hold no secret at all. Only lines holding a literal of a
+        # present pattern can match, and str.find locates those far faster
+        # than any regex, so the patterns run on those lines alone.
+        for line_num in self._candidate_lines(source, patterns):
+            line = source.lines[line_num - 1]
+            line_lower = line.lower()
+            # These depend only on the line, so each is computed at most once
+            false_positive = None
+            snippet = None
+            generic_spans = []
+            for pattern_info in patterns:
+                # Repeat the literal test per line before running the regex
+                haystack = line_lower if pattern_info['ignore_case'] else line
+                if not any(literal in haystack for literal in pattern_info['literals']):
+                    continue
+                match = pattern_info['regex'].search(line)
+                if match is None:
+                    continue
+                # Report the first capture group when the pattern has one that matched
+                group = 1 if match.lastindex else 0
+                match_str = match.group(group)
+                if false_positive is None:
+                    false_positive = self._is_false_positive(match_str, line_lower)
+                if false_positive:
+                    continue
+                if pattern_info['generic']:
+                    # Two generic patterns firing on the same text are one
+                    # secret; report it once
+                    start, end = match.span()
+                    if any(start < seen_end and seen_start < end for seen_start, seen_end in generic_spans):
+                        continue
+                    generic_spans.append((start, end))
+
+                if snippet is None:
+                    snippet = line.strip()[:100]
+                masked = self._mask_secret(match_str)
+                autofix = self._generate_autofix(pattern_info, language)
+
+                findings.append(Finding(
+                    file=file_path,
+                    line=line_num,
+                    column=match.start(group) + 1,
+                    severity=pattern_info['severity'],
+                    vulnerability=pattern_info['description'],
+                    code_snippet=snippet,
+                    masked_secret=masked,
+                    recommendation=pattern_info['recommendation'],
+                    autofix=autofix,
+                    language=language,
+                ))
 
         return findings
\ No newline at end of file
@@ -6,85 +6,109 @@ Catches unsafe database queries with string concatenation or formatting.
 import re
 from typing import List, Dict
 
+from src.finding import Finding
+from src.source_file import SourceFile
+
+# The risky query shapes, in priority order, compiled once at import. Each
+# shape is a chain of steps that must occur in order on the line: an opening
+# quote, a SQL verb after it, then the shape's tail. Searching for each step
+# from the end of the previous one takes the earliest choice at every step,
+# which is all ``.*?`` between them could ever need, so the answer is the
+# same as the original patterns' but the work stays linear in the line
+# length. A single regex nesting the lazy runs backtracks cubically on long
+# lines that almost match, e.g. '"select ' repeated.
+_QUOTE = re.compile(r'["\']')
+_SQL_VERB = re.compile(r'SELECT|INSERT|UPDATE|DELETE|DROP', re.IGNORECASE)
+
+_QUERY_SHAPES = (
+    ('concat', (_QUOTE, _SQL_VERB, _QUOTE, re.compile(r'\+'))),
+    ('percent', (_QUOTE, _SQL_VERB, re.compile(r'%[sd]', re.IGNORECASE))),
+    ('fstring', (re.compile(r'f["\']', re.IGNORECASE), _SQL_VERB, re.compile(r'\{'))),
+    ('format', (_QUOTE, _SQL_VERB, _QUOTE, re.compile(r'\.format\(', re.IGNORECASE))),
+)
+
+
+def _query_shape(line: str):
+    """Return the name of the first query shape found on ``line``, or None."""
+    for name, steps in _QUERY_SHAPES:
+        pos = 0
+        for step in steps:
+            match = step.search(line, pos)
+            if match is None:
+                break
+            pos = match.end()
+        else:
+            return name
+    return None
+
+
+_PARAMETERIZE_ADVICE = 'Use parameterized queries instead. Example: cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))'
+
 class SQLInjectionDetector:
     """Detects SQL injection vulnerabilities in Python code."""
     
+    # The query shapes are Python idioms; the scanner runs this detector on Python files only
+    EXTENSIONS = frozenset({'.py'})
+    
     # Patterns that indicate SQL injection risks
     SQL_KEYWORDS = ['SELECT', 'INSERT', 'UPDATE', 'DELETE', 'DROP', 'CREATE', 'ALTER', 'EXEC']
     
-    def __init__(self):
-        self.findings = []
+    # (message, recommendation) for each query shape in _QUERY_SHAPES
+    _SHAPE_FINDINGS = {
+        'concat': (
+            'SQL query using string concatenation (+). This is vulnerable to SQL injection.',
+            'Use parameterized queries or prepared statements instead. Example: cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))',
+        ),
+        'percent': (
+            'SQL query using % string formatting. This is vulnerable to SQL injection.',
+            _PARAMETERIZE_ADVICE,
+        ),
+        'fstring': (
+            'SQL query using f-string interpolation. This is vulnerable to SQL injection.',
+            _PARAMETERIZE_ADVICE,
+        ),
+        'format': (
+            'SQL query using .format() method. This is vulnerable to SQL injection.',
+            _PARAMETERIZE_ADVICE,
+        ),
+    }
     
-    def scan(self, code: str, filename: str = "unknown") -> List[Dict]:
-        self.findings = []
-        lines = code.split('\n')
+    def scan(self, source: SourceFile) -> List[Finding]:
+        # Findings are kept local: one instance is shared by every scan
+        findings = []
+        filename = source.path
         
-        for line_num, line in enumerate(lines, start=1):
+        # Only lines holding a SQL keyword can match. Like ``keyword in
+        # line.upper()``, each keyword is found with str.find in the
+        # upper-cased file, which is far faster than a case-insensitive
+        # regex alternation of the keywords.
+        for line_num in source.literal_lines(self.SQL_KEYWORDS, source.code.upper()):
             # Skip comments
-            if line.strip().startswith('#'):
+            if source.comment_mask[line_num - 1]:
                 continue
             
-            # Check for SQL keywords in the line
-            has_sql = any(keyword in line.upper() for keyword in self.SQL_KEYWORDS)
+            line = source.lines[line_num - 1]
+            shape = _query_shape(line)
+            if shape is None:
+                continue
             
-            if has_sql:
-                # Pattern 1: String concatenation with +
-                if re.search(r'["\'].*?(SELECT|INSERT|UPDATE|DELETE|DROP).*?["\'].*?\+', line, re.IGNORECASE):
-                    self.findings.append({
-                        'file': filename,
-                        'line': line_num,
-                        'column': 1,
-                        'vulnerability': 'SQL Injection',
-                        'severity': 'CRITICAL',
-                        'message': 'SQL query using string concatenation (+). This is vulnerable to SQL injection.',
-                        'code_snippet': line.strip(),
-                        'recommendation': 'Use parameterized queries or prepared statements instead. Example: cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))'
-                    })
-                
-                # Pattern 2: String formatting with %
-                elif re.search(r'["\'].*?(SELECT|INSERT|UPDATE|DELETE|DROP).*?%[sd]', line, re.IGNORECASE):
-                    self.findings.append({
-                        'file': filename,
-                        'line': line_num,
-                        'column': 1,
-                        'vulnerability': 'SQL Injection',
-                        'severity': 'CRITICAL',
-                        'message': 'SQL query using % string formatting. This is vulnerable to SQL injection.',
-                        'code_snippet': line.strip(),
-                        'recommendation': 'Use parameterized queries instead. Example: cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))'
-                    })
-                
-                # Pattern 3: f-string with SQL
-                elif re.search(r'f["\'].*?(SELECT|INSERT|UPDATE|DELETE|DROP).*?\{', line, re.IGNORECASE):
-                    self.findings.append({
-                        'file': filename,
-                        'line': line_num,
-                        'column': 1,
-                        'vulnerability': 'SQL Injection',
-                        'severity': 'CRITICAL',
-                        'message': 'SQL query using f-string interpolation. This is vulnerable to SQL injection.',
-                        'code_snippet': line.strip(),
-                        'recommendation': 'Use parameterized queries instead. Example: cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))'
-                    })
-                
-                # Pattern 4: .format() with SQL
-                elif re.search(r'["\'].*?(SELECT|INSERT|UPDATE|DELETE|DROP).*?["\'].*?\.format\(', line, re.IGNORECASE):
-                    self.findings.append({
-                        'file': filename,
-                        'line': line_num,
-                        'column': 1,
-                        'vulnerability': 'SQL Injection',
-                        'severity': 'CRITICAL',
-                        'message': 'SQL query using .format() method. This is vulnerable to SQL injection.',
-                        'code_snippet': line.strip(),
-                        'recommendation': 'Use parameterized queries instead. Example: cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))'
-                    })
+            message, recommendation = self._SHAPE_FINDINGS[shape]
+            findings.append(Finding(
+                file=filename,
+                line=line_num,
+                column=1,
+                severity='CRITICAL',
+                vulnerability='SQL Injection',
+                code_snippet=line.strip(),
+                recommendation=recommendation,
+                message=message,
+            ))
         
-        return self.findings
+        return findings
     
-    def get_summary(self) -> Dict:
+    def get_summary(self, findings: List[Finding]) -> Dict:
         return {
-            'total_issues': len(self.findings),
-            'critical_severity': len([f for f in self.findings if f['severity'] == 'CRITICAL']),
-            'files_scanned': len(set(f['file'] for f in self.findings))
+            'total_issues': len(findings),
+            'critical_severity': len([f for f in findings if f.severity == 'CRITICAL']),
+            'files_scanned': len(set(f.file for f in findings))
         }
\ No newline at end of file
@@ -6,80 +6,81 @@ Catches unsafe HTML output and unescaped user input in web applications.
 import re
 from typing import List, Dict
 
+from src.finding import Finding
+from src.source_file import SourceFile
+
+# Compiled once at import rather than looked up in re's cache on every line
+_FSTRING_HTML = re.compile(r'f["\'].*<[^>]+>.*\{')
+_PERCENT_HTML = re.compile(r'["\'].*<[^>]+>.*%s.*["\'].*%')
+_FORMAT_HTML = re.compile(r'["\'].*<[^>]+>.*\{.*\}.*["\'].*\.format\(')
+# An assignment ('=' anywhere on the line) that adds a variable to a quoted tag
+# on either side
+_CONCAT_HTML = re.compile(r'^(?=.*=)(?:.*?["\']<[^>]+>["\'].*\+|.*?\+.*["\']<[^>]+>["\'])')
+
+_ESCAPE_ADVICE = 'Use template engines with auto-escaping or manually escape with html.escape()'
+
 class XSSDetector:
     """Detects XSS vulnerabilities in Python web application code."""
     
-    def __init__(self):
-        self.findings = []
+    # Every pattern below needs an HTML tag on the line.
+    # [^>\n] keeps a whole-file search from running a tag across lines.
+    _TAG_PATTERN = re.compile(r'<[^>\n]+>')
+    
+    # (pattern, message, recommendation), checked in order; the first match wins
+    _RULES = (
+        (
+            _FSTRING_HTML,
+            'HTML output using f-string with user input. This is vulnerable to XSS attacks.',
+            'Use template engines with auto-escaping (Jinja2, Django templates) or manually escape with html.escape() or markupsafe.escape()',
+        ),
+        (
+            _PERCENT_HTML,
+            'HTML output using % formatting with user input. This is vulnerable to XSS attacks.',
+            _ESCAPE_ADVICE,
+        ),
+        (
+            _FORMAT_HTML,
+            'HTML output using .format() with user input. This is vulnerable to XSS attacks.',
+            _ESCAPE_ADVICE,
+        ),
+        (
+            _CONCAT_HTML,
+            'HTML output using string concatenation. This is vulnerable to XSS attacks.',
+            _ESCAPE_ADVICE,
+        ),
+    )
     
-    def scan(self, code: str, filename: str = "unknown") -> List[Dict]:
-        self.findings = []
-        lines = code.split('\n')
+    def scan(self, source: SourceFile) -> List[Finding]:
+        # Findings are kept local so one instance can serve every scan
+        findings = []
+        filename = source.path
         
-        for line_num, line in enumerate(lines, start=1):
-            if line.strip().startswith('#'):
+        # Only lines holding an HTML tag can match; the line index finds them
+        for line_num in source.match_lines(self._TAG_PATTERN):
+            if source.comment_mask[line_num - 1]:
                 continue
             
-            stripped = line.strip()
-            
-            # Pattern 1: f-string with HTML tags
-            if re.search(r'f["\'].*<[^>]+>.*\{', stripped):
-                self.findings.append({
-                    'file': filename,
-                    'line': line_num,
-                    'column': 1,
-                    'vulnerability': 'XSS (Cross-Site Scripting)',
-                    'severity': 'HIGH',
-                    'message': 'HTML output using f-string with user input. This is vulnerable to XSS attacks.',
-                    'code_snippet': stripped,
-                    'recommendation': 'Use template engines with auto-escaping (Jinja2, Django templates) or manually escape with html.escape() or markupsafe.escape()'
-                })
-            
-            # Pattern 2: % formatting with HTML tags
-            elif re.search(r'["\'].*<[^>]+>.*%s.*["\'].*%', stripped):
-                self.findings.append({
-                    'file': filename,
-                    'line': line_num,
-                    'column': 1,
-                    'vulnerability': 'XSS (Cross-Site Scripting)',
-                    'severity': 'HIGH',
-                    'message': 'HTML output using % formatting with user input. This is vulnerable to XSS attacks.',
-                    'code_snippet': stripped,
-                    'recommendation': 'Use template engines with auto-escaping or manually escape with html.escape()'
-                })
-            
-            # Pattern 3: .format() with HTML tags
-            elif re.search(r'["\'].*<[^>]+>.*\{.*\}.*["\'].*\.format\(', stripped):
-                self.findings.append({
-                    'file': filename,
-                    'line': line_num,
-                    'column': 1,
-                    'vulnerability': 'XSS (Cross-Site Scripting)',
-                    'severity': 'HIGH',
-                    'message': 'HTML output using .format() with user input. This is vulnerable to XSS attacks.',
-                    'code_snippet': stripped,
-                    'recommendation': 'Use template engines with auto-escaping or manually escape with html.escape()'
-                })
+            stripped = source.lines[line_num - 1].strip()
             
-            # Pattern 4: String concatenation with HTML tags and variable
-            elif '<' in stripped and '>' in stripped and '+' in stripped and '=' in stripped:
-                if re.search(r'["\']<[^>]+>["\'].*\+', stripped) or re.search(r'\+.*["\']<[^>]+>["\']', stripped):
-                    self.findings.append({
-                        'file': filename,
-                        'line': line_num,
-                        'column': 1,
-                        'vulnerability': 'XSS (Cross-Site Scripting)',
-                        'severity': 'HIGH',
-                        'message': 'HTML output using string concatenation. This is vulnerable to XSS attacks.',
-                        'code_snippet': stripped,
-                        'recommendation': 'Use template engines with auto-escaping or manually escape with html.escape()'
-                    })
+            for pattern, message, recommendation in self._RULES:
+                if pattern.search(stripped):
+                    findings.append(Finding(
+                        file=filename,
+                        line=line_num,
+                        column=1,
+                        severity='HIGH',
+                        vulnerability='XSS (Cross-Site Scripting)',
+                        code_snippet=stripped,
+                        recommendation=recommendation,
+                        message=message,
+                    ))
+                    break
         
-        return self.findings
+        return findings
     
-    def get_summary(self) -> Dict:
+    def get_summary(self, findings: List[Finding]) -> Dict:
         return {
-            'total_issues': len(self.findings),
-            'high_severity': len([f for f in self.findings if f['severity'] == 'HIGH']),
-            'files_scanned': len(set(f['file'] for f in self.findings))
+            'total_issues': len(findings),
+            'high_severity': len([f for f in findings if f.severity == 'HIGH']),
+            'files_scanned': len(set(f.file for f in findings))
         }
\ No newline at end of file
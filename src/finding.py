@@ -0,0 +1,23 @@
+"""
+The finding record shared by CodeShield AI detectors, the scanner and the CLI.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(slots=True)
+class Finding:
+    """One reported issue; fields are slots, so the report reads them without dict lookups."""
+    file: str
+    line: int
+    column: int
+    severity: str
+    vulnerability: str
+    code_snippet: str
+    recommendation: str = ''
+    message: Optional[str] = None
+    masked_secret: Optional[str] = None
+    autofix: Optional[Dict] = None
+    language: Optional[str] = None
+    function: Optional[str] = None
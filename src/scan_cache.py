@@ -0,0 +1,193 @@
+"""
+Incremental scan cache for CodeShield AI.
+Reuses findings for files that have not changed since the previous run.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+
+from src.finding import Finding
+
+try:
+    import fcntl
+except ImportError:  # Windows: runs are not serialised, last writer wins
+    fcntl = None
+
+
+def default_cache_dir():
+    """Pick a cache directory outside the checkout being scanned.
+
+    CODESHIELD_CACHE_DIR wins, e.g. a path CI restores between runs. On a
+    GitHub runner the cache goes under RUNNER_TEMP, elsewhere under the
+    user's cache directory.
+    """
+    configured = os.environ.get('CODESHIELD_CACHE_DIR')
+    if configured:
+        return configured
+    runner_temp = os.environ.get('RUNNER_TEMP')
+    if runner_temp:
+        return os.path.join(runner_temp, 'codeshield-cache')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'codeshield')
+
+
+def is_within(path, root):
+    """Whether ``path`` is ``root`` or lies below it, after resolving symlinks."""
+    path = os.path.realpath(path)
+    root = os.path.realpath(root)
+    try:
+        return os.path.commonpath([path, root]) == root
+    except ValueError:  # different drives on Windows
+        return False
+
+
+CACHE_DIR = default_cache_dir()
+TTL_SECONDS = 24 * 60 * 60
+MAX_ENTRIES = 2000
+
+
+def new_digest(data=b''):
+    """Start the BLAKE2b digest that identifies a file's content."""
+    return hashlib.blake2b(data, digest_size=16)
+
+
+def file_digest(file_path):
+    """Return the BLAKE2b digest of a file's bytes."""
+    digest = new_digest()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """Findings per file, keyed by content hash and detector ruleset.
+
+    A lookup first compares ``(mtime_ns, size)`` from ``os.stat``. A changed
+    size is a miss outright; only a changed mtime makes the file be hashed,
+    so touched-but-unchanged files still hit. Entries are keyed by absolute
+    path, so scans started from different directories share them.
+
+    Cached findings are trusted as if the files had been scanned, so the
+    index must not be writable by the code under review: a cache directory
+    inside GITHUB_WORKSPACE is refused with ValueError, and the scanner
+    drops the cache for a scan whose tree contains it (see ``inside``).
+    The index is JSON rather than pickle so it can never execute code on load.
+    """
+
+    def __init__(self, ruleset, cache_dir=CACHE_DIR):
+        workspace = os.environ.get('GITHUB_WORKSPACE')
+        if workspace and is_within(cache_dir, workspace):
+            raise ValueError(f"cache directory {cache_dir} is inside the workspace {workspace}")
+        self.ruleset = ruleset
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.lock_path = os.path.join(cache_dir, '.lock')
+        self.entries = {}
+        self._dirty = False
+        self._load()
+
+    @contextmanager
+    def _locked(self, exclusive):
+        """Hold a lock on the cache directory so concurrent runs do not clobber it."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('ruleset') != self.ruleset:
+            return {}
+        entries = data.get('entries')
+        if not isinstance(entries, dict):
+            return {}
+        cutoff = time.time() - TTL_SECONDS
+        return {path: entry for path, entry in entries.items() if entry.get('used', 0) >= cutoff}
+
+    def inside(self, root):
+        """Whether the cache directory lies in the tree rooted at ``root``."""
+        return is_within(self.cache_dir, root)
+
+    def _load(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        with self._locked(exclusive=False):
+            self.entries = self._read_index()
+
+    def get(self, file_path):
+        """Return cached findings for an unchanged file, or None on a miss."""
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is None:
+            return None
+        try:
+            st = os.stat(file_path)
+            if st.st_size != entry['size']:
+                # A different length is a different file; no need to hash it
+                return None
+            if st.st_mtime_ns != entry['mtime_ns']:
+                if file_digest(file_path) != entry['digest']:
+                    return None
+                entry['mtime_ns'] = st.st_mtime_ns
+        except OSError:
+            return None
+        entry['used'] = time.time()
+        self._dirty = True
+        # Report the file under the path it was asked for, not the one it was stored under
+        return [Finding(**{**finding, 'file': file_path}) for finding in entry['findings']]
+
+    def put(self, file_path, findings, fingerprint):
+        """Record the findings produced for a freshly scanned file.
+
+        ``fingerprint`` is the ``(mtime_ns, size, digest)`` of the bytes that
+        were scanned, taken when the file was read (see SourceFile.from_path).
+        Hashing the file again here would read it twice, and would store the
+        findings under the wrong digest if it changed during the scan.
+        """
+        if fingerprint is None:
+            return
+        mtime_ns, size, digest = fingerprint
+        self.entries[os.path.abspath(file_path)] = {
+            'mtime_ns': mtime_ns,
+            'size': size,
+            'digest': digest,
+            'used': time.time(),
+            'findings': [asdict(finding) for finding in findings],
+        }
+        self._dirty = True
+
+    def save(self):
+        """Merge with the on-disk index, evict old entries and write it back atomically."""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with self._locked(exclusive=True):
+                entries = self._read_index()
+                entries.update(self.entries)
+                if len(entries) > MAX_ENTRIES:
+                    newest = sorted(entries.items(), key=lambda item: item[1]['used'], reverse=True)
+                    entries = dict(newest[:MAX_ENTRIES])
+                tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'ruleset': self.ruleset, 'entries': entries}, f)
+                os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Warning: Could not write scan cache: {e}")
+            return
+        self.entries = entries
+        self._dirty = False
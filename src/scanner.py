@@ -2,147 +2,433 @@
 CodeShield AI - Main Scanner with AutoFix AI
 """
 
+import hashlib
+import io
 import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.detectors.dangerous_functions import DangerousFunctionsDetector
 from src.detectors.secrets_detector import SecretsDetector
+from src.detectors.sql_injection import SQLInjectionDetector
+from src.finding import Finding
+from src.scan_cache import ScanCache
+from src.source_file import SourceFile
+
+
+def ruleset_version(detectors, max_line_length):
+    """Fingerprint everything that shapes findings so cached ones expire when it changes.
+
+    That is the detector modules, this module and the ones it reads files and
+    records findings with, plus the line-length limit.
+    """
+    modules = {type(detector).__module__ for detector in detectors}
+    modules.update((__name__, SourceFile.__module__, Finding.__module__, ScanCache.__module__))
+    digest = hashlib.blake2b(digest_size=16)
+    for module in sorted(modules):
+        with open(sys.modules[module].__file__, 'rb') as f:
+            digest.update(f.read())
+    digest.update(repr(max_line_length).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Below this many files, process start-up costs more than the scan itself
+PARALLEL_MIN_FILES = 32
+
+# Files read ahead of the detectors on a serial scan, and the threads reading them
+PREFETCH_FILES = 16
+PREFETCH_READERS = 4
+
+# A file with a line longer than this among its first lines is treated as
+# minified or generated and skipped; None scans every file
+MAX_LINE_LENGTH = 2000
+MINIFIED_SAMPLE_LINES = 1000
+
+# A NUL character this close to the start marks a binary file. Files read from
+# disk are checked before decoding (SourceFile.binary); this covers the rest.
+BINARY_SAMPLE_CHARS = 4096
+
+# Report sections, in the order they are listed
+SEVERITY_ICONS = {
+    'CRITICAL': '🔴',
+    'HIGH': '🟠',
+    'MEDIUM': '🟡',
+    'LOW': '🟢',
+}
+
+# Report separator lines, newline included
+_REPORT_RULE = "=" * 70 + "\n"
+_SECTION_RULE = "-" * 70 + "\n"
+_ISSUE_RULE = "  " + "·" * 68 + "\n"
+_CODE_RULE = "  " + "-" * 50 + "\n"
+
+# Directories never descended into, and file types never read, by scan_directory
+SKIP_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv',
+    'venv', 'dist', 'build', '.next', 'vendor'
+})
+SKIP_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.ico', '.svg',
+    '.pdf', '.zip', '.tar', '.gz', '.exe', '.bin',
+    '.lock', '.sum'
+})
+
+# Paths handed to a worker per round trip; amortizes pickling over many small files
+PARALLEL_CHUNK_FILES = 32
+
+# One detector set per process: every scanner shares the detectors and any
+# per-detector caches (e.g. AutoFix text)
+_SECRETS = SecretsDetector()
+_DANGEROUS = DangerousFunctionsDetector()
+_SQLI = SQLInjectionDetector()
+_DETECTORS = (_SECRETS, _DANGEROUS, _SQLI)
+
+_worker_scanner = None
+_worker_fingerprint = False
+
+
+def _init_worker(max_line_length, fingerprint):
+    """Build the scanner, and so the detectors, once per worker process."""
+    global _worker_scanner, _worker_fingerprint
+    _worker_scanner = CodeShieldScanner(jobs=1, max_line_length=max_line_length)
+    _worker_fingerprint = fingerprint
+
+
+def _scan_one(file_path):
+    """Scan one file inside a worker process with that worker's detectors."""
+    return _worker_scanner._run_detectors(file_path, _worker_fingerprint)
+
+
+def skip_reason(source):
+    """Say why a file should not be scanned at all, or return None to scan it.
+
+    Only the start of the file is sampled, so deciding costs little even for
+    large files.
+    """
+    if source.binary or '\x00' in source.code[:BINARY_SAMPLE_CHARS]:
+        return 'binary content'
+    return None
+
+
+def has_long_line(source, max_line_length=MAX_LINE_LENGTH):
+    """Whether a line near the start of the file exceeds ``max_line_length``.
+
+    Such lines mark minified or generated files, which are rarely
+    hand-written code yet are the worst case for every code pattern.
+    """
+    sample = source.code.split('\n', MINIFIED_SAMPLE_LINES)
+    if len(sample) > MINIFIED_SAMPLE_LINES:
+        sample.pop()  # the unsplit remainder of the file, not a line
+    return max(map(len, sample)) > max_line_length
+
+
+def _iter_files(path):
+    """Yield the files under ``path`` in os.walk's top-down order.
+
+    os.scandir hands back each entry's type from the directory read itself,
+    so unlike os.walk no entry needs a stat() call of its own. A directory's
+    files come before its subdirectories. Symlinks are skipped altogether:
+    following them would cost a stat() each, could loop forever on a cycle
+    and could pull in files from outside the tree being scanned.
+    """
+    try:
+        with os.scandir(path) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    _, ext = os.path.splitext(entry.name)
+                    if ext.lower() not in SKIP_EXTENSIONS:
+                        yield entry.path
+    except OSError:
+        # os.walk skips directories it cannot list; so do we
+        return
+
+    for subdir in subdirs:
+        yield from _iter_files(subdir)
 
 
 class CodeShieldScanner:
-    def __init__(self):
-        self.detectors = [
-            SecretsDetector(),
-        ]
+    def __init__(self, use_cache=False, jobs=None, max_line_length=MAX_LINE_LENGTH):
+        self.detectors = list(_DETECTORS)
         self.findings = []
         self.autofix_suggestions = []
+        self.max_line_length = max_line_length
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = ScanCache(ruleset_version(self.detectors, max_line_length))
+            except ValueError as e:
+                print(f"Warning: Scan cache disabled: {e}")
+        self.jobs = jobs or os.cpu_count() or 1
+        # The detectors that apply to each file extension, picked on first use
+        self._plans = {}
 
     def scan_file(self, file_path):
         """Scan a single file for security issues."""
+        if self.cache is not None:
+            cached = self.cache.get(file_path)
+            if cached is not None:
+                self.findings.extend(cached)
+                return cached
+
+        scanned = self._run_detectors(file_path, fingerprint=self.cache is not None)
+        if scanned is None:
+            return []
+
+        file_findings, fingerprint = scanned
+        if self.cache is not None:
+            self.cache.put(file_path, file_findings, fingerprint)
+
+        self.findings.extend(file_findings)
+        return file_findings
+
+    def _read_source(self, file_path, fingerprint=False):
+        """Load a file as a SourceFile; None if it cannot be read."""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-        except Exception as e:
+            return SourceFile.from_path(file_path, fingerprint)
+        except (OSError, ValueError) as e:
+            # OSError: missing or unreadable; ValueError: mmap of a file that
+            # shrank while being read
             print(f"Warning: Could not read {file_path}: {e}")
+            return None
+
+    def _plan(self, file_path):
+        """Return the detectors that apply to a file.
+
+        A detector with an EXTENSIONS set only sees files with one of those
+        extensions; one without it sees every file.
+        """
+        ext = os.path.splitext(file_path)[1].lower()
+        plan = self._plans.get(ext)
+        if plan is None:
+            plan = self._plans[ext] = [
+                detector for detector in self.detectors
+                if ext in getattr(detector, 'EXTENSIONS', (ext,))
+            ]
+        return plan
+
+    def _detect(self, source):
+        """Run every detector that applies over an already loaded file."""
+        reason = skip_reason(source)
+        if reason is not None:
+            print(f"Skipping {source.path}: {reason}")
             return []
 
+        plan = self._plan(source.path)
+        # Bundles and generated files still leak real keys, so detectors
+        # marked SCANS_MINIFIED keep scanning them; the code checks skip.
+        minified_plan = [detector for detector in plan if getattr(detector, 'SCANS_MINIFIED', False)]
+        if (len(minified_plan) < len(plan) and self.max_line_length is not None
+                and has_long_line(source, self.max_line_length)):
+            plan = minified_plan
+            print(f"Skipping code checks on {source.path}: line longer than "
+                  f"{self.max_line_length} characters (minified or generated)")
+
+        # Each detector rules out a file with its own cheap whole-file test.
+        # A single pattern joining every detector's trigger would be one pass,
+        # but CPython's re loses its literal fast search on such an
+        # alternation and ends up slower than the separate tests.
         file_findings = []
-        for detector in self.detectors:
-            results = detector.scan(file_path, content)
+        for detector in plan:
+            results = detector.scan(source)
             file_findings.extend(results)
-
-        self.findings.extend(file_findings)
         return file_findings
 
+    def _run_detectors(self, file_path, fingerprint=False):
+        """Read a file and run every detector on it.
+
+        Returns the findings with the file's fingerprint (None unless asked
+        for), or None if the file cannot be read.
+        """
+        source = self._read_source(file_path, fingerprint)
+        if source is None:
+            return None
+        return self._detect(source), source.fingerprint
+
     def scan_directory(self, directory):
         """Recursively scan a directory for security issues."""
-        skip_dirs = {
-            '.git', 'node_modules', '__pycache__', '.venv',
-            'venv', 'dist', 'build', '.next', 'vendor'
-        }
-        skip_extensions = {
-            '.jpg', '.jpeg', '.png', '.gif', '.ico', '.svg',
-            '.pdf', '.zip', '.tar', '.gz', '.exe', '.bin',
-            '.lock', '.sum'
-        }
+        if self.cache is not None and self.cache.inside(directory):
+            # The scanned code could then plant entries that hide its own findings
+            print(f"Warning: Scan cache disabled: {self.cache.cache_dir} is inside {directory}")
+            self.cache = None
+        paths = list(_iter_files(directory))
+        return self.scan_many(paths)
+
+    def scan_many(self, paths):
+        """Scan a list of files, fanning them out to worker processes when it pays.
+
+        Findings are returned, and recorded, in the order of ``paths``.
+        """
+        results, pending = self._split_cached(paths)
+
+        if self.jobs > 1 and len(pending) >= PARALLEL_MIN_FILES:
+            try:
+                self._scan_parallel(pending, results)
+            except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                print(f"Warning: Parallel scan unavailable ({e}), scanning serially")
+
+        for file_path, source in self._prefetch([p for p in pending if p not in results]):
+            if source is None:
+                results[file_path] = []
+                continue
+            file_findings = self._detect(source)
+            if self.cache is not None:
+                self.cache.put(file_path, file_findings, source.fingerprint)
+            results[file_path] = file_findings
 
         all_findings = []
+        for file_path in paths:
+            all_findings.extend(results[file_path])
+        self.findings.extend(all_findings)
+        return all_findings
+
+    def _split_cached(self, paths):
+        """Return cached findings by path, plus the paths that still need a scan."""
+        results = {}
+        pending = []
+        for file_path in paths:
+            cached = self.cache.get(file_path) if self.cache is not None else None
+            if cached is not None:
+                results[file_path] = cached
+            else:
+                pending.append(file_path)
+        return results, pending
 
-        for root, dirs, files in os.walk(directory):
-            dirs[:] = [d for d in dirs if d not in skip_dirs]
+    def _prefetch(self, paths):
+        """Yield (path, SourceFile) pairs while reader threads load files ahead.
 
-            for file in files:
-                _, ext = os.path.splitext(file)
-                if ext.lower() in skip_extensions:
+        File reads release the GIL, so the next files are read from disk while
+        the detectors are busy with the current one. At most PREFETCH_FILES
+        reads are in flight, and files come back in the order of ``paths``.
+        """
+        fingerprint = self.cache is not None
+        with ThreadPoolExecutor(max_workers=PREFETCH_READERS) as readers:
+            window = deque()
+            for file_path in paths:
+                window.append((file_path, readers.submit(self._read_source, file_path, fingerprint)))
+                if len(window) >= PREFETCH_FILES:
+                    file_path, future = window.popleft()
+                    yield file_path, future.result()
+            while window:
+                file_path, future = window.popleft()
+                yield file_path, future.result()
+
+    def _scan_parallel(self, pending, results):
+        """Scan files across worker processes, storing findings in ``results``."""
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=(self.max_line_length, self.cache is not None),
+        ) as executor:
+            for file_path, scanned in zip(pending, executor.map(_scan_one, pending, chunksize=PARALLEL_CHUNK_FILES)):
+                if scanned is None:
+                    results[file_path] = []
                     continue
+                file_findings, fingerprint = scanned
+                if self.cache is not None:
+                    self.cache.put(file_path, file_findings, fingerprint)
+                results[file_path] = file_findings
 
-                file_path = os.path.join(root, file)
-                findings = self.scan_file(file_path)
-                all_findings.extend(findings)
+    def generate_report(self, out=None):
+        """Generate a detailed security report with AutoFix AI suggestions.
 
-        return all_findings
+        The report is written to the text stream ``out`` as it is built, so a
+        large one is never held in memory. Without ``out`` it is returned as a
+        string instead.
+        """
+        if out is None:
+            buf = io.StringIO()
+            self.generate_report(buf)
+            return buf.getvalue()
 
-    def generate_report(self):
-        """Generate a detailed security report with AutoFix AI suggestions."""
         if not self.findings:
-            return self._generate_clean_report()
-
-        critical = [f for f in self.findings if f.get('severity') == 'CRITICAL']
-        high = [f for f in self.findings if f.get('severity') == 'HIGH']
-        medium = [f for f in self.findings if f.get('severity') == 'MEDIUM']
-        low = [f for f in self.findings if f.get('severity') == 'LOW']
-
-        report = []
-        report.append("=" * 70)
-        report.append("  CODESHIELD AI - SECURITY SCAN REPORT WITH AUTOFIX AI")
-        report.append("=" * 70)
-        report.append("")
-        report.append(f"  TOTAL ISSUES FOUND: {len(self.findings)}")
-        report.append(f"  CRITICAL: {len(critical)}  |  HIGH: {len(high)}  |  MEDIUM: {len(medium)}  |  LOW: {len(low)}")
-        report.append("")
-        report.append("=" * 70)
-
-        severity_groups = [
-            ('CRITICAL', critical, '🔴'),
-            ('HIGH', high, '🟠'),
-            ('MEDIUM', medium, '🟡'),
-            ('LOW', low, '🟢'),
-        ]
+            out.write(self._generate_clean_report())
+            return None
 
-        for severity, group, icon in severity_groups:
-            if not group:
-                continue
+        # One pass over the findings; other severities are not listed
+        critical, high, medium, low = [], [], [], []
+        buckets = {'CRITICAL': critical, 'HIGH': high, 'MEDIUM': medium, 'LOW': low}
+        for finding in self.findings:
+            bucket = buckets.get(finding.severity)
+            if bucket is not None:
+                bucket.append(finding)
 
-            report.append("")
-            report.append(f"{icon} {severity} SEVERITY ISSUES ({len(group)} found)")
-            report.append("-" * 70)
+        w = out.write
+        w(_REPORT_RULE)
+        w("  CODESHIELD AI - SECURITY SCAN REPORT WITH AUTOFIX AI\n")
+        w(_REPORT_RULE)
+        w("\n")
+        w(f"  TOTAL ISSUES FOUND: {len(self.findings)}\n")
+        w(f"  CRITICAL: {len(critical)}  |  HIGH: {len(high)}  |  MEDIUM: {len(medium)}  |  LOW: {len(low)}\n")
+        w("\n")
+        w(_REPORT_RULE)
+
+        # Only severities that have findings get a section
+        active_groups = [
+            (severity, buckets[severity], icon)
+            for severity, icon in SEVERITY_ICONS.items()
+            if buckets[severity]
+        ]
+
+        for severity, group, icon in active_groups:
+            w("\n")
+            w(f"{icon} {severity} SEVERITY ISSUES ({len(group)} found)\n")
+            w(_SECTION_RULE)
 
             for i, finding in enumerate(group, 1):
-                report.append("")
-                report.append(f"  Issue #{i}: {finding.get('vulnerability', 'Unknown')}")
-                report.append(f"  File:      {finding.get('file', 'Unknown')}")
-                report.append(f"  Line:      {finding.get('line', 0)}")
-                report.append(f"  Code:      {finding.get('code_snippet', '')[:80]}")
-
-                if finding.get('masked_secret'):
-                    report.append(f"  Secret:    {finding.get('masked_secret')}")
-
-                autofix = finding.get('autofix')
-                if autofix:
-                    report.append("")
-                    report.append("  ╔══════════════════════════════════════════╗")
-                    report.append("  ║         AUTOFIX AI SUGGESTION           ║")
-                    report.append("  ╚══════════════════════════════════════════╝")
-                    report.append("")
-                    report.append(f"  RISK: {autofix.get('risk', '')}")
-                    report.append("")
-                    report.append("  HOW TO FIX:")
+                w("\n")
+                w(f"  Issue #{i}: {finding.vulnerability}\n")
+                w(f"  File:      {finding.file}\n")
+                w(f"  Line:      {finding.line}\n")
+                w(f"  Code:      {finding.code_snippet[:80]}\n")
+
+                if finding.masked_secret:
+                    w(f"  Secret:    {finding.masked_secret}\n")
+
+                autofix = finding.autofix
+                if autofix is not None:
+                    w("\n")
+                    w("  ╔══════════════════════════════════════════╗\n")
+                    w("  ║         AUTOFIX AI SUGGESTION           ║\n")
+                    w("  ╚══════════════════════════════════════════╝\n")
+                    w("\n")
+                    w(f"  RISK: {autofix.get('risk', '')}\n")
+                    w("\n")
+                    w("  HOW TO FIX:\n")
                     for step in autofix.get('steps', []):
-                        report.append(f"    {step}")
-                    report.append("")
-                    report.append("  SECURE CODE:")
-                    report.append("  " + "-" * 50)
+                        w(f"    {step}\n")
+                    w("\n")
+                    w("  SECURE CODE:\n")
+                    w(_CODE_RULE)
                     for line in autofix.get('fix_code', '').split('\n'):
-                        report.append(f"    {line}")
-                    report.append("  " + "-" * 50)
-                    report.append("")
-                    report.append(f"  ADD TO .env FILE:")
-                    report.append(f"    {autofix.get('env_example', '')}")
-
-                report.append("")
-                report.append("  " + "·" * 68)
-
-        report.append("")
-        report.append("=" * 70)
-        report.append("  AUTOFIX AI SUMMARY")
-        report.append("=" * 70)
-        report.append("")
-        report.append(f"  {len(self.findings)} security issues found with AutoFix AI suggestions.")
-        report.append(f"  Follow the fix steps above to secure your codebase.")
-        report.append("")
-        report.append("  Need automated PR creation? Upgrade to Pro:")
-        report.append("  https://codeshield.ie#pricing")
-        report.append("")
-        report.append("=" * 70)
-
-        return '\n'.join(report)
+                        w(f"    {line}\n")
+                    w(_CODE_RULE)
+                    w("\n")
+                    w(f"  ADD TO .env FILE:\n")
+                    w(f"    {autofix.get('env_example', '')}\n")
+
+                w("\n")
+                w(_ISSUE_RULE)
+
+        w("\n")
+        w(_REPORT_RULE)
+        w("  AUTOFIX AI SUMMARY\n")
+        w(_REPORT_RULE)
+        w("\n")
+        w(f"  {len(self.findings)} security issues found with AutoFix AI suggestions.\n")
+        w(f"  Follow the fix steps above to secure your codebase.\n")
+        w("\n")
+        w("  Need automated PR creation? Upgrade to Pro:\n")
+        w("  https://codeshield.ie#pricing\n")
+        w("\n")
+        w(_REPORT_RULE[:-1])  # the report ends without a newline
+        return None
 
     def _generate_clean_report(self):
         """Generate report when no issues found."""
@@ -0,0 +1,149 @@
+"""
+Shared source view for CodeShield AI detectors.
+The scanner loads a file once and hands the same SourceFile to every detector.
+"""
+
+import mmap
+import os
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import repeat
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.scan_cache import new_digest
+
+# Files this size and up are memory-mapped and paged in by the OS on demand;
+# anything smaller skips the mmap set-up and is read in one system call
+MMAP_MIN_BYTES = 1024 * 1024
+
+# A NUL byte this close to the start marks a binary file (git's heuristic)
+BINARY_SAMPLE_BYTES = 8192
+
+
+@dataclass(frozen=True)
+class SourceFile:
+    """A file's content; the line views all detectors share are built on first use.
+
+    Most files hold nothing any detector looks for, and those are ruled out
+    by searching ``code`` directly, so they never pay for splitting lines.
+    """
+
+    path: str
+    code: str
+    # Set by from_path for binary files, whose bytes are never decoded
+    binary: bool = False
+    # (mtime_ns, size, digest) of the bytes read, when from_path is asked for it
+    fingerprint: Optional[Tuple[int, int, str]] = None
+
+    @classmethod
+    def from_text(cls, path: str, code: str) -> "SourceFile":
+        """Wrap already decoded ``code``; nothing is split until a detector asks."""
+        return cls(path=path, code=code)
+
+    @classmethod
+    def from_path(cls, path: str, fingerprint: bool = False) -> "SourceFile":
+        """Read a file and decode it once; binary files are left undecoded.
+
+        Files under a megabyte, nearly all of any repository, are read
+        unbuffered in a single read() call. Larger ones (bundles, generated
+        code) go through a read-only memory map, so the binary check touches
+        only their first pages and the bytes are never copied before decoding.
+        With ``fingerprint`` the bytes read are also hashed for the scan cache.
+        """
+        with open(path, 'rb', buffering=0) as f:
+            st = os.fstat(f.fileno())
+            if st.st_size < MMAP_MIN_BYTES:
+                data = f.read(st.st_size)
+                stamp = cls._fingerprint(st, data) if fingerprint else None
+                if data.find(b'\x00', 0, BINARY_SAMPLE_BYTES) != -1:
+                    return cls(path=path, code='', binary=True, fingerprint=stamp)
+                code = data.decode('utf-8', 'ignore')
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    stamp = cls._fingerprint(st, mm) if fingerprint else None
+                    if mm.find(b'\x00', 0, BINARY_SAMPLE_BYTES) != -1:
+                        return cls(path=path, code='', binary=True, fingerprint=stamp)
+                    code = str(mm, 'utf-8', 'ignore')
+        if '\r' in code:
+            # Match the universal-newline translation of text-mode reads
+            code = code.replace('\r\n', '\n').replace('\r', '\n')
+        return cls(path=path, code=code, fingerprint=stamp)
+
+    @staticmethod
+    def _fingerprint(st: os.stat_result, data) -> Tuple[int, int, str]:
+        # The mtime is taken before the read: a file changed mid-read then
+        # fails the mtime check next run and is re-hashed, never wrongly hit
+        return st.st_mtime_ns, len(data), new_digest(data).hexdigest()
+
+    @cached_property
+    def lines(self) -> Tuple[str, ...]:
+        """The lines of ``code``, split once for every detector."""
+        return tuple(self.code.split('\n'))
+
+    @cached_property
+    def code_lower(self) -> str:
+        """``code`` lower-cased once, for case-insensitive literal tests."""
+        return self.code.lower()
+
+    @cached_property
+    def comment_mask(self) -> Tuple[bool, ...]:
+        """Whether each line is a comment."""
+        # lstrip() hands back the same object when there is no indent, so
+        # this only allocates for indented lines and loops entirely in C.
+        return tuple(map(str.startswith, map(str.lstrip, self.lines), repeat('#')))
+
+    def literal_lines(self, literals: Iterable[str], text: Optional[str] = None) -> List[int]:
+        """Return, in order, the lines on which any of ``literals`` occurs.
+
+        Each literal is located with str.find, which keeps its fast search
+        where a regex alternation of them would not, and after a hit the
+        search moves on to the next line. ``text`` stands in for ``code``
+        when it has the same lines, e.g. ``code_lower`` for literals that are
+        matched case-insensitively.
+        """
+        if text is None:
+            text = self.code
+        starts = []
+        for literal in literals:
+            pos = text.find(literal)
+            while pos != -1:
+                starts.append(pos)
+                pos = text.find('\n', pos)
+                if pos == -1:
+                    break
+                pos = text.find(literal, pos + 1)
+        starts.sort()
+
+        line_nums = []
+        line_num = 1
+        prev = 0
+        for pos in starts:
+            line_num += text.count('\n', prev, pos)
+            prev = pos
+            if not line_nums or line_nums[-1] != line_num:
+                line_nums.append(line_num)
+        return line_nums
+
+    def match_lines(self, pattern) -> Iterator[int]:
+        """Yield, in order, each line on which ``pattern`` has a match starting.
+
+        This is a single pass over ``code`` that needs no line index: line
+        numbers are counted forward from the previous hit. After a hit the
+        search resumes at the next line rather than at the match end: a
+        pattern that runs across a newline must not hide a match on a later
+        line.
+        """
+        code = self.code
+        pos = 0
+        line_num = 1
+        while True:
+            match = pattern.search(code, pos)
+            if match is None:
+                return
+            start = match.start()
+            line_num += code.count('\n', pos, start)
+            yield line_num
+            pos = code.find('\n', start) + 1
+            if not pos:
+                return
+            line_num += 1
@@ -0,0 +1,29 @@
+"""Tests for DangerousFunctionsDetector findings."""
+
+import pickle
+from dataclasses import asdict
+
+from src.detectors.dangerous_functions import DangerousFunctionsDetector
+from src.finding import Finding
+from src.source_file import SourceFile
+
+
+def _scan(code):
+    return DangerousFunctionsDetector().scan(SourceFile.from_text('app.py', code))
+
+
+def test_text_is_formatted_from_the_function():
+    [finding] = _scan('result = eval(user_input)\n')
+
+    assert finding.message == "Dangerous function 'eval()' detected. This can lead to code injection vulnerabilities."
+    assert finding.recommendation.startswith('Avoid eval().')
+
+
+def test_finding_round_trips_through_pickle_and_cache_records():
+    [finding] = _scan('exec(code)\n')
+
+    assert pickle.loads(pickle.dumps(finding)) == finding
+
+    stored = Finding(**asdict(finding))
+    assert stored.message == finding.message
+    assert stored.recommendation == finding.recommendation
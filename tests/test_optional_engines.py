@@ -0,0 +1,41 @@
+"""The optional engines must give the same answers as the pure-Python paths.
+
+Each test is skipped when its engine is not installed; CI installs
+requirements-optional.txt in one job so both paths run there.
+"""
+
+import random
+
+import pytest
+
+import src.detectors.secrets_detector as secrets_detector
+from src.detectors.secrets_detector import SecretsDetector
+from src.source_file import SourceFile
+from test_differential import SECRET_FRAGMENTS, SEEDS, _texts
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_hyperscan_presence_matches_literal_tests(seed):
+    pytest.importorskip('hyperscan')
+    assert secrets_detector._HYPERSCAN is not None
+
+    fast = SecretsDetector()
+    plain = SecretsDetector()
+    plain.hyperscan = None
+    for text in _texts(SECRET_FRAGMENTS, seed):
+        source = SourceFile.from_text('f.py', text)
+        assert fast._present_patterns(source) == plain._present_patterns(source), repr(text)
+
+
+def test_ahocorasick_indicators_match_regex(monkeypatch):
+    pytest.importorskip('ahocorasick')
+    indicators = SecretsDetector.FALSE_POSITIVE_INDICATORS
+    automaton_search = secrets_detector._build_indicator_search(indicators)
+    monkeypatch.setattr(secrets_detector, 'ahocorasick', None)
+    regex_search = secrets_detector._build_indicator_search(indicators)
+
+    rng = random.Random(0)
+    words = [indicator.lower() for indicator in indicators] + ['exa', 'mple', 'x', 'ß', ' ', '_']
+    for _ in range(2000):
+        line_lower = ''.join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+        assert automaton_search(line_lower) == regex_search(line_lower), repr(line_lower)
@@ -0,0 +1,87 @@
+"""Detectors must stay fast on long lines built to make regexes backtrack.
+
+Each case takes minutes with a backtracking pattern and milliseconds with a
+linear one, so the bound is loose enough for a slow CI runner.
+"""
+
+import time
+
+import pytest
+
+from src.detectors.dangerous_functions import DangerousFunctionsDetector
+from src.detectors.secrets_detector import SecretsDetector
+from src.detectors.sql_injection import SQLInjectionDetector
+from src.scanner import CodeShieldScanner
+from src.source_file import SourceFile
+
+TIME_LIMIT_SECONDS = 2.0
+
+
+def _short_id(line):
+    return repr(line[:16])
+
+
+def _scan_time(detector, code):
+    source = SourceFile.from_text('adversarial.py', code)
+    start = time.perf_counter()
+    detector.scan(source)
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize('line', [
+    '"select ' * 1000,
+    '"select ' * 20000,
+    "f'select {" * 5000,
+    'q = "SELECT' + ' %' * 20000,
+    'q = "DELETE \'' * 5000 + '.form',
+], ids=_short_id)
+def test_sql_shapes_are_linear(line):
+    code = 'x = 1\n' * 1000 + line + '\n'
+
+    assert _scan_time(SQLInjectionDetector(), code) < TIME_LIMIT_SECONDS
+
+
+# Near-misses for each secret pattern: its literal prefix repeated, or a
+# long run that almost completes the pattern but never does
+SECRET_LINES = [
+    'aws secret ' * 5000,
+    'aws' + ' secret' * 5000 + ' "' + 'A' * 39,
+    'password = "' + 'a' * 50000,
+    'pwd' * 20000 + ' =',
+    'api_key = ' + ' ' * 50000,
+    'postgres://' + 'a' * 50000 + ':' + '@' * 50000,
+    'postgres://a:' * 10000,
+    'eyJ' + 'a' * 50000,
+    'eyJa.' * 10000,
+    'xoxb-' * 10000,
+    'sk_live_' * 10000,
+    '-----BEGIN ' * 10000,
+]
+
+DANGEROUS_LINES = [
+    'eval(' * 20000,
+    '(' * 50000 + 'eval(x)',
+    'x = ' + '[' * 5000 + ']' * 5000 + '; exec(y)',
+]
+
+
+@pytest.mark.parametrize('line', SECRET_LINES, ids=_short_id)
+def test_secret_patterns_are_linear(line):
+    assert _scan_time(SecretsDetector(), line + '\n') < TIME_LIMIT_SECONDS
+
+
+@pytest.mark.parametrize('line', DANGEROUS_LINES, ids=_short_id)
+def test_dangerous_calls_are_linear(line):
+    assert _scan_time(DangerousFunctionsDetector(), line + '\n') < TIME_LIMIT_SECONDS
+
+
+def test_scanner_without_line_limit(tmp_path):
+    # With the long-line check off, every detector sees every line
+    path = tmp_path / 'adversarial.py'
+    path.write_text('\n'.join(SECRET_LINES + DANGEROUS_LINES + ['"select ' * 20000]) + '\n')
+    scanner = CodeShieldScanner(jobs=1, max_line_length=None)
+
+    start = time.perf_counter()
+    scanner.scan_file(str(path))
+
+    assert time.perf_counter() - start < 3 * TIME_LIMIT_SECONDS
@@ -0,0 +1,213 @@
+"""Tests for the incremental scan cache."""
+
+import os
+import time
+
+import pytest
+
+import src.scan_cache as scan_cache
+from src.finding import Finding
+from src.scan_cache import ScanCache
+from src.scanner import CodeShieldScanner
+from src.source_file import SourceFile
+
+
+@pytest.fixture(autouse=True)
+def no_workspace(monkeypatch):
+    monkeypatch.delenv('GITHUB_WORKSPACE', raising=False)
+
+
+def _finding(path, line=1):
+    return Finding(
+        file=path, line=line, column=1, severity='HIGH',
+        vulnerability='Dangerous Function', code_snippet='eval(x)',
+    )
+
+
+def _fingerprint(path):
+    return SourceFile.from_path(path, fingerprint=True).fingerprint
+
+
+def _write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / 'cache')
+
+
+@pytest.fixture
+def source(tmp_path):
+    src_dir = tmp_path / 'src'
+    src_dir.mkdir()
+    return src_dir / 'app.py'
+
+
+def test_hit_after_save_and_reload(cache_dir, source):
+    path = _write(source, 'eval(x)\n')
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], _fingerprint(path))
+    cache.save()
+
+    assert ScanCache('rules', cache_dir).get(path) == [_finding(path)]
+
+
+def test_miss_for_unknown_file(cache_dir, source):
+    assert ScanCache('rules', cache_dir).get(str(source)) is None
+
+
+def test_size_change_is_a_miss(cache_dir, source):
+    path = _write(source, 'eval(x)\n')
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], _fingerprint(path))
+
+    _write(source, 'eval(x)  \n')
+
+    assert cache.get(path) is None
+
+
+def test_touched_but_unchanged_file_hits(cache_dir, source):
+    path = _write(source, 'eval(x)\n', mtime_ns=1_000_000_000)
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], _fingerprint(path))
+
+    _write(source, 'eval(x)\n', mtime_ns=2_000_000_000)
+
+    assert cache.get(path) == [_finding(path)]
+
+
+def test_same_size_different_content_is_a_miss(cache_dir, source):
+    path = _write(source, 'eval(x)\n', mtime_ns=1_000_000_000)
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], _fingerprint(path))
+
+    _write(source, 'eval(y)\n', mtime_ns=2_000_000_000)
+
+    assert cache.get(path) is None
+
+
+def test_hit_reports_the_path_asked_for(cache_dir, source, monkeypatch):
+    path = _write(source, 'eval(x)\n')
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], _fingerprint(path))
+
+    monkeypatch.chdir(source.parent)
+
+    assert cache.get('app.py') == [_finding('app.py')]
+
+
+def test_ruleset_change_drops_entries(cache_dir, source):
+    path = _write(source, 'eval(x)\n')
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], _fingerprint(path))
+    cache.save()
+
+    assert ScanCache('other rules', cache_dir).get(path) is None
+
+
+def test_entries_expire_after_ttl(cache_dir, source, monkeypatch):
+    path = _write(source, 'eval(x)\n')
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], _fingerprint(path))
+    cache.save()
+
+    later = time.time() + scan_cache.TTL_SECONDS + 60
+    monkeypatch.setattr(scan_cache.time, 'time', lambda: later)
+
+    assert ScanCache('rules', cache_dir).get(path) is None
+
+
+def test_save_evicts_least_recently_used(cache_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(scan_cache, 'MAX_ENTRIES', 2)
+    clock = iter(range(1_000_000, 2_000_000))
+    monkeypatch.setattr(scan_cache.time, 'time', lambda: next(clock))
+    paths = [_write(tmp_path / f'f{i}.py', f'x = {i}\n') for i in range(3)]
+
+    cache = ScanCache('rules', cache_dir)
+    for path in paths:
+        cache.put(path, [], _fingerprint(path))
+    cache.get(paths[0])  # refresh the oldest entry
+    cache.save()
+
+    reloaded = ScanCache('rules', cache_dir)
+    assert reloaded.get(paths[0]) == []
+    assert reloaded.get(paths[1]) is None
+    assert reloaded.get(paths[2]) == []
+
+
+def test_cache_inside_workspace_is_refused(tmp_path, monkeypatch):
+    monkeypatch.setenv('GITHUB_WORKSPACE', str(tmp_path))
+
+    with pytest.raises(ValueError):
+        ScanCache('rules', str(tmp_path / '.codeshield' / 'cache'))
+
+
+def test_default_cache_dir_prefers_runner_temp(tmp_path, monkeypatch):
+    monkeypatch.delenv('CODESHIELD_CACHE_DIR', raising=False)
+    monkeypatch.setenv('RUNNER_TEMP', str(tmp_path))
+
+    assert scan_cache.default_cache_dir() == os.path.join(str(tmp_path), 'codeshield-cache')
+
+
+def test_scanner_drops_cache_inside_scanned_tree(tmp_path):
+    tree = tmp_path / 'repo'
+    tree.mkdir()
+    _write(tree / 'app.py', 'eval(x)\n')
+    scanner = CodeShieldScanner(jobs=1)
+    scanner.cache = ScanCache('rules', str(tree / '.cache'))
+    findings = scanner.scan_directory(str(tree))
+
+    assert scanner.cache is None
+    assert [f.function for f in findings] == ['eval']
+    assert not (tree / '.cache').exists()
+
+
+def test_fingerprint_matches_file_digest(source, tmp_path, monkeypatch):
+    path = _write(source, 'eval(x)\n')
+    st = os.stat(path)
+
+    assert _fingerprint(path) == (st.st_mtime_ns, st.st_size, scan_cache.file_digest(path))
+
+    monkeypatch.setattr('src.source_file.MMAP_MIN_BYTES', 1)
+    assert _fingerprint(path) == (st.st_mtime_ns, st.st_size, scan_cache.file_digest(path))
+
+
+def test_file_changed_during_scan_is_not_a_hit(cache_dir, source):
+    path = _write(source, 'eval(x)\n', mtime_ns=1_000_000_000)
+    scanned = SourceFile.from_path(path, fingerprint=True)
+    _write(source, 'eval(y)\n', mtime_ns=2_000_000_000)
+
+    cache = ScanCache('rules', cache_dir)
+    cache.put(path, [_finding(path)], scanned.fingerprint)
+
+    assert cache.get(path) is None
+
+
+def test_scanner_reads_each_file_once(tmp_path, monkeypatch):
+    tree = tmp_path / 'repo'
+    tree.mkdir()
+    for i in range(3):
+        _write(tree / f'f{i}.py', f'eval(x{i})\n')
+    monkeypatch.setattr(scan_cache, 'file_digest', lambda path: pytest.fail('file hashed twice'))
+
+    scanner = CodeShieldScanner(jobs=1)
+    scanner.cache = ScanCache('rules', str(tmp_path / 'cache'))
+    scanner.scan_directory(str(tree))
+    scanner.cache.save()
+
+    reloaded = ScanCache('rules', str(tmp_path / 'cache'))
+    assert reloaded.get(str(tree / 'f0.py'))[0].function == 'eval'
+
+
+def test_codeshield_directory_is_scanned(tmp_path):
+    hidden = tmp_path / '.codeshield'
+    hidden.mkdir()
+    _write(hidden / 'payload.py', 'eval(x)\n')
+
+    findings = CodeShieldScanner(jobs=1).scan_directory(str(tmp_path))
+
+    assert [f.function for f in findings] == ['eval']
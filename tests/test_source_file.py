@@ -0,0 +1,98 @@
+"""Tests for SourceFile loading and its shared line views."""
+
+import re
+
+import src.source_file as source_file
+from src.source_file import SourceFile
+
+
+def test_from_path_normalises_newlines(tmp_path):
+    path = tmp_path / 'mixed.py'
+    path.write_bytes(b'a = 1\r\nb = 2\rc = 3\n')
+
+    source = SourceFile.from_path(str(path))
+
+    assert source.code == 'a = 1\nb = 2\nc = 3\n'
+    assert source.lines == ('a = 1', 'b = 2', 'c = 3', '')
+    assert not source.binary
+
+
+def test_from_path_matches_text_mode_read(tmp_path):
+    path = tmp_path / 'text.py'
+    path.write_bytes('x = "café"\r\n\r\ny = 1\r'.encode('utf-8'))
+
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        expected = f.read()
+
+    assert SourceFile.from_path(str(path)).code == expected
+
+
+def test_from_path_empty_file(tmp_path):
+    path = tmp_path / 'empty.py'
+    path.write_bytes(b'')
+
+    source = SourceFile.from_path(str(path))
+
+    assert source.code == ''
+    assert source.lines == ('',)
+    assert not source.binary
+
+
+def test_comment_mask_marks_indented_comments():
+    source = SourceFile.from_text('f.py', '# top\n    # indented\ncode  # trailing\n')
+
+    assert source.comment_mask == (True, True, False, False)
+
+
+def test_literal_lines_reports_each_line_once():
+    source = SourceFile.from_text('f.py', 'aa aa\nb\nxa\n\na')
+
+    assert source.literal_lines(['a']) == [1, 3, 5]
+    assert source.literal_lines(['a', 'b']) == [1, 2, 3, 5]
+    assert source.literal_lines(['zz']) == []
+
+
+def test_literal_lines_on_case_folded_text():
+    source = SourceFile.from_text('f.py', 'Select 1\nnothing\nSELECT 2')
+
+    assert source.literal_lines(['SELECT'], source.code.upper()) == [1, 3]
+    assert source.literal_lines(['select'], source.code_lower) == [1, 3]
+
+
+def test_match_lines_resumes_on_next_line():
+    source = SourceFile.from_text('f.py', 'ab\nb\nab ab\n')
+    pattern = re.compile(r'a\s*b')
+
+    assert list(source.match_lines(pattern)) == [1, 3]
+    # A match that runs across a newline still counts from its start line
+    assert list(source.match_lines(re.compile(r'b\nb'))) == [1]
+
+
+def test_from_path_detects_binary(tmp_path):
+    path = tmp_path / 'blob.bin'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR')
+
+    source = SourceFile.from_path(str(path))
+
+    assert source.binary
+    assert source.code == ''
+
+
+def test_from_path_ignores_nul_past_sample(tmp_path):
+    path = tmp_path / 'late_nul.txt'
+    path.write_bytes(b'a' * source_file.BINARY_SAMPLE_BYTES + b'\x00tail')
+
+    assert not SourceFile.from_path(str(path)).binary
+
+
+def test_from_path_memory_maps_large_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(source_file, 'MMAP_MIN_BYTES', 16)
+    text_path = tmp_path / 'large.py'
+    text_path.write_bytes(b'password = "x"\r\n' * 8)
+    binary_path = tmp_path / 'large.bin'
+    binary_path.write_bytes(b'head\x00' + b'z' * 64)
+
+    source = SourceFile.from_path(str(text_path))
+
+    assert source.code == 'password = "x"\n' * 8
+    assert SourceFile.from_path(str(binary_path)).binary